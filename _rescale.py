@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Coordinate Rescaling Helpers
+Small vectorised kernels for converting detection click coordinates
+from chat-relative physical pixels to full-screen physical/logical pixels
+"""
+
+import numpy as np
+
+# Optional JIT acceleration
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Below this many detections the JIT call overhead outweighs the savings
+JIT_THRESHOLD = 8
+
+def _rescale_clicks_py(clicks, offset, scale_factor):
+    """Convert chat-relative click coordinates to full-screen coordinates
+
+    Args:
+        clicks: (N, 2) int32 array of chat-relative physical (x, y) pairs
+        offset: (2,) int32 array with the chat area's logical (x1, y1) origin
+        scale_factor: Display scale factor (logical -> physical)
+
+    Returns:
+        Tuple of (physical, logical) (N, 2) arrays
+    """
+    physical = clicks + offset * scale_factor
+    # Algebraically (clicks + offset*scale) // scale for integer offsets,
+    # fused so the logical result needs no second pass over physical
+    logical = offset + clicks // scale_factor
+    return physical, logical
+
+if NUMBA_AVAILABLE:
+    _rescale_clicks_jit = njit(cache=True, nogil=True)(_rescale_clicks_py)
+
+def rescale_clicks(clicks, offset, scale_factor=2):
+    """Rescale all detection click coordinates in one vectorised pass"""
+    clicks = np.asarray(clicks, dtype=np.int32)
+    offset = np.asarray(offset, dtype=np.int32)
+
+    if NUMBA_AVAILABLE and len(clicks) >= JIT_THRESHOLD:
+        return _rescale_clicks_jit(clicks, offset, scale_factor)
+    return _rescale_clicks_py(clicks, offset, scale_factor)
@@ -5,105 +5,673 @@ Executes configurable action plans with clicks, waits, and other actions
 """
 
 import argparse
+import logging
+import logging.handlers
 import subprocess
 import sys
 import time
 import os
+import functools
+import importlib.util
+import re
+import shelve
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Module logger: records are buffered and written in batches so dense
+# action plans don't pay a write() syscall per line
+log = logging.getLogger('action_automation')
+if not log.handlers:
+    _stream_handler = logging.StreamHandler(sys.stdout)
+    _stream_handler.setFormatter(logging.Formatter('%(message)s'))
+    _log_buffer = logging.handlers.MemoryHandler(
+        capacity=64, flushLevel=logging.WARNING, target=_stream_handler
+    )
+    log.addHandler(_log_buffer)
+    log.setLevel(logging.INFO)
+
+def flush_log():
+    """Flush buffered log records (called at step boundaries)"""
+    for handler in log.handlers:
+        handler.flush()
 
 # Import shared configuration
 from config import ACTION_PLANS, COORDINATES, PYAUTOGUI_SETTINGS, MUMU_PATHS, TIMING, APPLICATION_PATHS
 
-# Import automation libraries
-try:
-    import pyautogui
-    AUTOMATION_AVAILABLE = True
-except ImportError:
-    AUTOMATION_AVAILABLE = False
-
-# Import coordinate detection functions
-try:
-    from find_coordinates import find_icon_coordinates_scaled
-    ICON_DETECTION_AVAILABLE = True
-except ImportError:
-    ICON_DETECTION_AVAILABLE = False
-
-# Import avatar detection and text extraction
-try:
-    from avatar_message_block_detection import find_avatars_with_templates
-    from message_text_extractor import MessageTextExtractor
-    AVATAR_KEYWORD_DETECTION_AVAILABLE = True
-except ImportError:
-    AVATAR_KEYWORD_DETECTION_AVAILABLE = False
+def precise_sleep(duration):
+    """Sleep `duration` seconds, spinning the last millisecond
+
+    time.sleep alone can overshoot by a scheduler quantum; sleeping most
+    of the interval and busy-waiting the tail keeps short pacing gaps
+    (like the inter-click pause) from compounding across a long plan.
+    """
+    deadline = time.perf_counter() + duration
+    coarse = duration - 0.001
+    if coarse > 0:
+        time.sleep(coarse)
+    while time.perf_counter() < deadline:
+        pass
+
+# Heavyweight optional dependencies (pyautogui, cv2, numpy, PIL) are
+# detected with find_spec - which locates a module without importing it -
+# and imported on first use, so listing/help CLI paths skip their cold start
+def _spec_available(*names):
+    """True when every named module can be located (without importing it)"""
+    try:
+        return all(importlib.util.find_spec(name) is not None for name in names)
+    except (ImportError, ValueError):
+        return False
+
+AUTOMATION_AVAILABLE = _spec_available('pyautogui')
+ICON_DETECTION_AVAILABLE = AUTOMATION_AVAILABLE and _spec_available('cv2', 'numpy')
+QUARTZ_AVAILABLE = _spec_available('Quartz')
+AVATAR_KEYWORD_DETECTION_AVAILABLE = ICON_DETECTION_AVAILABLE and _spec_available('requests', 'PIL')
+OCR_PREFILTER_AVAILABLE = _spec_available('pytesseract')
+
+# Lazily imported modules - None until their loader runs
+pyautogui = None
+find_icon_coordinates_scaled = None
+cv2 = None
+np = None
+find_avatars_with_templates = None
+list_available_templates = None
+capture_chat_region = None
+CHAT_AREA = None
+SCALE_FACTOR = None
+MessageTextExtractor = None
+rescale_clicks = None
+
+def _load_automation():
+    """Import pyautogui on first use and apply the configured settings"""
+    global pyautogui
+    if pyautogui is None:
+        import pyautogui
+        pyautogui.FAILSAFE = PYAUTOGUI_SETTINGS['FAILSAFE']
+        pyautogui.PAUSE = PYAUTOGUI_SETTINGS['PAUSE']
+    return pyautogui
+
+def _load_cv2():
+    """Import OpenCV on first use"""
+    global cv2
+    if cv2 is None:
+        import cv2
+    return cv2
+
+def _load_numpy():
+    """Import numpy on first use"""
+    global np
+    if np is None:
+        import numpy as np
+    return np
+
+def _load_icon_detection():
+    """Import the template-matching helpers on first use"""
+    global find_icon_coordinates_scaled
+    if find_icon_coordinates_scaled is None:
+        _load_automation()
+        from find_coordinates import find_icon_coordinates_scaled
+    return find_icon_coordinates_scaled
+
+def _load_avatar_detection():
+    """Import avatar detection and text extraction modules on first use"""
+    global np, find_avatars_with_templates, list_available_templates
+    global capture_chat_region, CHAT_AREA, SCALE_FACTOR
+    global MessageTextExtractor, rescale_clicks
+    # Keyed on the avatar helpers, not np - _load_numpy may have already
+    # imported numpy on its own
+    if find_avatars_with_templates is None:
+        _load_automation()
+        import numpy as np
+        from avatar_message_block_detection import (
+            find_avatars_with_templates, list_available_templates,
+            capture_chat_region, CHAT_AREA, SCALE_FACTOR
+        )
+        from message_text_extractor import MessageTextExtractor
+        from _rescale import rescale_clicks
+
+# Mouse-down/mouse-up events allocated once and repositioned per click
+_CLICK_EVENTS = None
+
+def _fast_click(x, y):
+    """Click at logical (x, y), posting Quartz events directly when possible"""
+    global _CLICK_EVENTS
+    if QUARTZ_AVAILABLE:
+        # Native Quartz event posting (macOS) - avoids pyautogui's per-call
+        # PAUSE and failsafe overhead on every click. Cheap after the first
+        # call: the import is a sys.modules lookup once Quartz is loaded,
+        # and the event objects are reused via CGEventSetLocation instead
+        # of being rebuilt per click.
+        from Quartz import (
+            CGEventCreateMouseEvent, CGEventPost, CGEventSetLocation,
+            kCGHIDEventTap, kCGEventLeftMouseDown, kCGEventLeftMouseUp,
+            kCGMouseButtonLeft
+        )
+        if _CLICK_EVENTS is None:
+            _CLICK_EVENTS = (
+                CGEventCreateMouseEvent(None, kCGEventLeftMouseDown, (x, y), kCGMouseButtonLeft),
+                CGEventCreateMouseEvent(None, kCGEventLeftMouseUp, (x, y), kCGMouseButtonLeft),
+            )
+        down, up = _CLICK_EVENTS
+        CGEventSetLocation(down, (x, y))
+        CGEventSetLocation(up, (x, y))
+        CGEventPost(kCGHIDEventTap, down)
+        CGEventPost(kCGHIDEventTap, up)
+    else:
+        pyautogui.click(x, y)
+
+def _fast_scroll(clicks, x, y):
+    """Scroll at logical (x, y), posting Quartz wheel events when possible
+
+    Completes the native-event path: with clicks already bypassing
+    pyautogui, the chat scroll was the last mouse action paying its
+    per-call overhead.
+    """
+    if QUARTZ_AVAILABLE:
+        from Quartz import (
+            CGEventCreateScrollWheelEvent, CGEventPost,
+            CGWarpMouseCursorPosition, kCGHIDEventTap, kCGScrollEventUnitLine
+        )
+        CGWarpMouseCursorPosition((x, y))
+        event = CGEventCreateScrollWheelEvent(None, kCGScrollEventUnitLine, 1, clicks)
+        CGEventPost(kCGHIDEventTap, event)
+    else:
+        pyautogui.scroll(clicks, x=x, y=y)
+
+def _phash64(image):
+    """64-bit perceptual hash of a crop (DCT sign bits of the 8x8 block)
+
+    Robust to the few-pixel shifts that scrolling introduces, so the same
+    message block hashes identically across overlapping frames.
+    """
+    cv2 = _load_cv2()
+    np = _load_numpy()
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA)
+    dct = cv2.dct(np.float32(small))
+    block = dct[:8, :8].flatten()
+    median = np.median(block[1:])  # skip the DC term
+    return int(''.join('1' if value > median else '0' for value in block), 2)
+
+def _ocr_contains_any(image, keywords):
+    """Best-effort OCR check for keyword text in a crop
+
+    Returns False only when OCR read some text and none of the keywords
+    appear in it - the one case cheap OCR can safely rule out. Returns
+    None (undecided) when OCR is unavailable, fails, or reads nothing,
+    so the LLM still gets the final word on fuzzy matches.
+    """
+    if not OCR_PREFILTER_AVAILABLE:
+        return None
+    try:
+        import pytesseract
+        text = pytesseract.image_to_string(image, lang='chi_sim')
+    except Exception:
+        return None
+    if not text.strip():
+        return None
+    return any(keyword in text for keyword in keywords)
+
+@functools.lru_cache(maxsize=1)
+def _cached_templates():
+    """Template files rarely change within a run - scan the directory once"""
+    return list_available_templates()
+
+@dataclass(slots=True, frozen=True)
+class Action:
+    """Normalised action-plan step, parsed from its config dict exactly once
+
+    Frozen: compiled plans are shared across runs (and baked into the
+    specialized runners), so steps must never be mutated in place.
+    """
+    type: str
+    description: str = 'No description'
+    coordinate: object = None
+    keywords: object = None
+    avatar_templates: list = None
+    confidence: float = 0.8
+    return_coordinates: bool = False
+    max_scroll_attempts: int = 6
+    scroll_attempt: int = 0
+    duration: float = 1
+    app: str = None
+    until: str = None
+    timeout: float = 15
+    poll_interval: float = 0.25
+    min_wait: float = 0
+    pause: float = 0
+    max_attempts: int = 3
+    interval: float = 0.3
+    # Click target resolved from COORDINATES at parse time - exactly one
+    # of resolved_xy / resolved_template is set for a valid reference
+    resolved_xy: tuple = None
+    resolved_template: str = None
+    resolved_roi: object = None
+
+    @classmethod
+    def from_dict(cls, action):
+        if isinstance(action, cls):
+            return action
+        action_type = action.get('action')
+        resolved_xy = resolved_template = resolved_roi = None
+        if action_type == 'click':
+            resolved_xy, resolved_template, resolved_roi = \
+                _resolve_coordinate(action.get('coordinate'))
+        return cls(
+            type=action_type,
+            description=action.get('description', 'No description'),
+            coordinate=action.get('coordinate'),
+            keywords=action.get('keywords'),
+            avatar_templates=action.get('avatar_templates'),
+            confidence=action.get('confidence', 0.8),
+            return_coordinates=action.get('return_coordinates', False),
+            max_scroll_attempts=action.get('max_scroll_attempts', 6),
+            scroll_attempt=action.get('_current_scroll_attempt', 0),
+            duration=action.get('duration', 1),
+            app=action.get('app'),
+            until=action.get('until'),
+            timeout=action.get('timeout', 15),
+            poll_interval=action.get('poll_interval', 0.25),
+            min_wait=action.get('min_wait', 0),
+            pause=action.get('pause', 0),
+            max_attempts=action.get('max_attempts', 3),
+            interval=action.get('interval', 0.3),
+            resolved_xy=resolved_xy,
+            resolved_template=resolved_template,
+            resolved_roi=resolved_roi,
+        )
+
+def _classify_coordinate_value(coord_value):
+    """Classify one COORDINATES value into its (xy, template, roi) form"""
+    if isinstance(coord_value, dict):
+        return None, coord_value['template'], coord_value.get('roi')
+    if isinstance(coord_value, str) and coord_value.endswith('.png'):
+        return None, coord_value, None
+    return tuple(coord_value), None, None
+
+# Every named coordinate classified exactly once at import - lookups in
+# the executor dispatch on the precomputed form instead of re-running
+# the isinstance chain, and the proxy keeps the map read-only
+_RESOLVED_COORDINATES = MappingProxyType({
+    name: _classify_coordinate_value(value)
+    for name, value in COORDINATES.items()
+})
+
+_UNRESOLVED = (None, None, None)
+
+def _resolve_coordinate(coordinate):
+    """Resolve a click coordinate reference to its concrete form
+
+    Named coordinates hit the precomputed _RESOLVED_COORDINATES map;
+    literal pairs are normalized to tuples.
+
+    Returns:
+        Tuple of (xy, template_path, roi) - one of xy/template_path is
+        set for a valid reference, all three None when it is invalid.
+    """
+    if isinstance(coordinate, str):
+        return _RESOLVED_COORDINATES.get(coordinate, _UNRESOLVED)
+    if isinstance(coordinate, (list, tuple)) and len(coordinate) == 2:
+        return tuple(coordinate), None, None
+    return _UNRESOLVED
+
+def _compile_plan(plan):
+    """Parse and validate a plan's action dicts once, into an immutable tuple"""
+    return tuple(Action.from_dict(action) for action in plan)
+
+# Plans are static config - compile them to Action tuples at import time so
+# execution never re-parses the dicts
+_COMPILED_PLANS = {name: _compile_plan(plan) for name, plan in ACTION_PLANS.items()}
+
+@functools.lru_cache(maxsize=1)
+def _rendered_plans_listing():
+    """Render the action-plan listing once; the plans don't change at runtime
+
+    Call _rendered_plans_listing.cache_clear() after a config reload.
+    """
+    lines = ["📋 Available Action Plans:", "=" * 40]
+
+    for plan_name, actions in ACTION_PLANS.items():
+        lines.append(f"\n🎯 {plan_name}:")
+        for i, action in enumerate(actions, 1):
+            action_type = action.get('action', 'unknown')
+            description = action.get('description', 'No description')
+
+            if action_type == 'click':
+                coord = action.get('coordinate', 'unknown')
+                lines.append(f"   {i}. Click {coord} - {description}")
+            elif action_type == 'avatar_keyword_click':
+                keywords = action.get('keywords', 'unknown')
+                lines.append(f"   {i}. Avatar keyword click [{keywords}] - {description}")
+            elif action_type == 'wait':
+                duration = action.get('duration', 'unknown')
+                lines.append(f"   {i}. Wait {duration}s - {description}")
+            elif action_type == 'wait_until':
+                target = action.get('coordinate', 'unknown')
+                timeout = action.get('timeout', 'unknown')
+                lines.append(f"   {i}. Wait until {target} (up to {timeout}s) - {description}")
+            elif action_type == 'open_app':
+                app = action.get('app', 'unknown')
+                lines.append(f"   {i}. Open {app} - {description}")
+            else:
+                lines.append(f"   {i}. {action_type} - {description}")
+
+    return "\n".join(lines)
+
+# Disk-backed cache of detected icon coordinates, shared across runs
+ICON_CACHE_FILE = os.path.expanduser('~/.cache/gameauto/icons.db')
+
+def _screen_ahash(roi=None):
+    """64-bit average hash of the screen (or a logical-coordinate ROI)
+
+    A cheap fingerprint of the current screen state: grayscale, shrink to
+    8x8, threshold against the mean. Stable UI states hash identically, so
+    the hash can key cached icon coordinates.
+    """
+    cv2 = _load_cv2()
+    np = _load_numpy()
+
+    screenshot = pyautogui.screenshot(region=roi) if roi else pyautogui.screenshot()
+    gray = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2GRAY)
+    small = cv2.resize(gray, (8, 8), interpolation=cv2.INTER_AREA)
+    bits = (small > small.mean()).flatten()
+    return int(''.join('1' if bit else '0' for bit in bits), 2)
+
+@functools.lru_cache(maxsize=1)
+def _applications_listing():
+    """Entry names under /Applications, read with a single scandir"""
+    try:
+        return {entry.name for entry in os.scandir('/Applications')}
+    except OSError:
+        return set()
+
+def _app_installed(path):
+    """Check an app bundle path against the /Applications listing
+
+    One cached readdir covers every candidate, instead of a stat() per
+    probe; paths outside /Applications fall back to os.path.exists.
+    """
+    if os.path.dirname(path) == '/Applications':
+        return os.path.basename(path) in _applications_listing()
+    return os.path.exists(path)
+
+@functools.lru_cache(maxsize=1)
+def find_mumu_path():
+    """Find MuMu模拟器Pro installation path on Mac (resolved once per process)"""
+    return next(filter(_app_installed, MUMU_PATHS), None)
 
 class ActionAutomation:
+    # Reuse a chat screenshot captured within this window instead of re-grabbing
+    CHAT_IMAGE_CACHE_TTL = 0.1  # seconds
+
+    # Cap text-crop height before LLM upload - chat glyphs stay readable
+    # well below Retina resolution, and vision-token cost tracks pixel count
+    TEXT_CROP_MAX_HEIGHT = 96  # pixels
+
+    # Maximum entries in the content-addressed keyword-verdict cache
+    KEYWORD_CACHE_SIZE = 256
+
+    # Which configured applications are installed, probed lazily and
+    # shared across instances - one stat per app per process
+    _APP_EXISTS = {}
+
     def __init__(self, verbose=False):
-        self.mumu_path = self.find_mumu_path()
         self.verbose = verbose
+        if verbose:
+            log.setLevel(logging.DEBUG)
         
-        # Configure PyAutoGUI settings
-        if AUTOMATION_AVAILABLE:
-            pyautogui.FAILSAFE = PYAUTOGUI_SETTINGS['FAILSAFE']
-            pyautogui.PAUSE = PYAUTOGUI_SETTINGS['PAUSE']
-        
-        # Initialize text extractor for keyword detection
-        self.text_extractor = None
-        if AVATAR_KEYWORD_DETECTION_AVAILABLE:
-            self.text_extractor = MessageTextExtractor()
-    
+        # PyAutoGUI settings are applied by _load_automation on first use
+
+        # Text extractor for keyword detection is built lazily on first use
+        self._text_extractor = None
+
+        # Cached chat screenshot: (monotonic timestamp, image array)
+        self._chat_image_cache = None
+
+        # Background chat-capture prefetch (worker created on first use)
+        self._capture_executor = None
+        self._pending_capture = None
+
+        # Timestamp of the previous click, for minimal inter-click pacing
+        self._last_click_time = 0.0
+
+        # Detected icon coordinates keyed by (template path, screen hash)
+        self._icon_cache = {}
+        self._last_icon_cache_key = None
+
+        # LRU of LLM keyword verdicts keyed by (crop pHash, keywords)
+        self._kw_cache = OrderedDict()
+
+    # O(1) action-type dispatch table, shared by all instances (populated
+    # with the unbound methods right after the class body below)
+    _DISPATCH = {}
+
+    @property
+    def text_extractor(self):
+        """Lazily construct the LLM text extractor on first keyword action"""
+        if self._text_extractor is None and AVATAR_KEYWORD_DETECTION_AVAILABLE:
+            _load_avatar_detection()
+            self._text_extractor = MessageTextExtractor()
+        return self._text_extractor
+
+    def prewarm(self):
+        """Pay one-time avatar-detection costs before the plan's hot loop
+
+        Decodes every template referenced by COORDINATES plus every avatar
+        template into the module caches and constructs the LLM text
+        extractor up front, so the first click and the first
+        avatar_keyword_click step pay only matching and inference cost.
+        The extractor is a thin REST client, so constructing it is the
+        whole model warmup.
+        """
+        if ICON_DETECTION_AVAILABLE:
+            _load_icon_detection()
+            from find_coordinates import preload_templates as _preload_click_templates
+            _preload_click_templates(
+                value for value in COORDINATES.values() if isinstance(value, str)
+            )
+            self.log("Click templates prewarmed")
+        if not AVATAR_KEYWORD_DETECTION_AVAILABLE:
+            return
+        _load_avatar_detection()
+        from avatar_message_block_detection import preload_templates
+        preload_templates(_cached_templates())
+        _ = self.text_extractor
+        self.log("Avatar templates and text extractor prewarmed")
+
+    def _prewarm_in_background(self):
+        """Run prewarm() on a daemon thread and return the thread
+
+        Started right after launching an application so template decoding
+        and extractor construction overlap the startup wait instead of
+        adding to the first detection step's latency.
+        """
+        thread = threading.Thread(target=self.prewarm, daemon=True)
+        thread.start()
+        return thread
+
+    def _capture_chat_image(self):
+        """Capture the chat region, reusing a recent or prefetched capture"""
+        if self._pending_capture is not None:
+            future = self._pending_capture
+            self._pending_capture = None
+            chat_image = future.result()
+            self._chat_image_cache = (time.monotonic(), chat_image)
+            self.log("Using prefetched chat screenshot")
+            return chat_image
+
+        if self._chat_image_cache is not None:
+            timestamp, cached_image = self._chat_image_cache
+            if time.monotonic() - timestamp < self.CHAT_IMAGE_CACHE_TTL:
+                self.log("Reusing cached chat screenshot")
+                return cached_image
+
+        chat_image = capture_chat_region()
+        self._chat_image_cache = (time.monotonic(), chat_image)
+        return chat_image
+
+    def _prefetch_chat_capture(self, delay):
+        """Schedule a chat capture on a background thread after `delay`
+
+        Lets the settle sleep and the screen grab run while the caller
+        returns to the search loop; _capture_chat_image collects the
+        result when the next pass actually needs the frame.
+        """
+        if self._capture_executor is None:
+            self._capture_executor = ThreadPoolExecutor(max_workers=1)
+
+        def settle_and_capture():
+            time.sleep(delay)
+            return capture_chat_region()
+
+        self._pending_capture = self._capture_executor.submit(settle_and_capture)
+
     def log(self, message):
-        """Print message if verbose mode is enabled"""
+        """Log message if verbose mode is enabled"""
         if self.verbose:
-            print(f"🔍 DEBUG: {message}")
+            log.debug(f"🔍 DEBUG: {message}")
         
-    def find_mumu_path(self):
-        """Find MuMu模拟器Pro installation path on Mac"""
-        for path in MUMU_PATHS:
-            if os.path.exists(path):
-                return path
-        return None
-    
+    @functools.cached_property
+    def mumu_path(self):
+        """MuMu模拟器Pro installation path, resolved lazily on first use"""
+        return find_mumu_path()
+
+    def _app_exists(self, app_name):
+        """Whether the configured application bundle is installed
+
+        Probes the path once per process and remembers the answer in the
+        class-level _APP_EXISTS map.
+        """
+        exists = self._APP_EXISTS.get(app_name)
+        if exists is None:
+            exists = _app_installed(APPLICATION_PATHS[app_name])
+            ActionAutomation._APP_EXISTS[app_name] = exists
+        return exists
+
+    def _pace_clicks(self):
+        """Sleep only the settle time still owed since the previous click
+
+        With pyautogui.PAUSE zeroed, this keeps the configured
+        inter-click gap without delaying non-mouse actions.
+        """
+        remaining = TIMING['CLICK_PAUSE'] - (time.monotonic() - self._last_click_time)
+        if remaining > 0:
+            precise_sleep(remaining)
+
+    @functools.cached_property
+    def _icon_shelf(self):
+        """Disk-backed icon-coordinate cache (None if it cannot be opened)"""
+        try:
+            os.makedirs(os.path.dirname(ICON_CACHE_FILE), exist_ok=True)
+            return shelve.open(ICON_CACHE_FILE)
+        except Exception as e:
+            self.log(f"Icon cache unavailable: {e}")
+            return None
+
+    def _icon_cache_lookup(self, template_path, screen_hash):
+        """Return cached (x, y) for this template + screen state, or None"""
+        key = (template_path, screen_hash)
+        coords = self._icon_cache.get(key)
+        if coords is None and self._icon_shelf is not None:
+            coords = self._icon_shelf.get(f"{template_path}|{screen_hash}")
+            if coords is not None:
+                self._icon_cache[key] = coords
+        return coords
+
+    def _icon_cache_store(self, template_path, screen_hash, coords):
+        """Record detected coordinates for this template + screen state"""
+        self._icon_cache[(template_path, screen_hash)] = coords
+        if self._icon_shelf is not None:
+            self._icon_shelf[f"{template_path}|{screen_hash}"] = coords
+
+    def _icon_cache_evict(self, key):
+        """Drop a cache entry whose coordinates turned out to be stale"""
+        template_path, screen_hash = key
+        self._icon_cache.pop(key, None)
+        if self._icon_shelf is not None:
+            self._icon_shelf.pop(f"{template_path}|{screen_hash}", None)
+
+    def _wait_until(self, deadline, probe=None, interval=0.05):
+        """Short-sleep until `probe()` is truthy or the deadline passes
+
+        Turns worst-case fixed waits into actual-case waits: the probe is
+        checked every `interval` seconds and the wait ends as soon as it
+        succeeds. Without a probe this is a plain sleep to the deadline.
+        """
+        if probe is None:
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+            return False
+
+        while time.monotonic() < deadline:
+            if probe():
+                return True
+            time.sleep(interval)
+        return False
+
+    def _wait_for_app(self, name, timeout):
+        """Poll until the named application process is running
+
+        Checks every 100 ms with pgrep and returns as soon as the process
+        appears, so a warm start doesn't pay the worst-case fixed wait.
+        The timeout keeps the old fixed duration as the upper bound.
+        """
+        def probe():
+            result = subprocess.run(['pgrep', '-f', name], capture_output=True)
+            return result.returncode == 0
+
+        if self._wait_until(time.monotonic() + timeout, probe, interval=0.1):
+            self.log(f"{name} process detected")
+            return True
+        return False
+
     def open_mumu(self):
         """Open MuMu模拟器Pro"""
         if not self.mumu_path:
-            print("❌ MuMu模拟器Pro not found in Applications folder")
-            print("Please make sure MuMu模拟器Pro is installed")
+            log.info("❌ MuMu模拟器Pro not found in Applications folder")
+            log.info("Please make sure MuMu模拟器Pro is installed")
             return False
         
         try:
-            print(f"🚀 Opening MuMu模拟器Pro from {self.mumu_path}")
+            log.info(f"🚀 Opening MuMu模拟器Pro from {self.mumu_path}")
             subprocess.run(["open", self.mumu_path], check=True)
-            print("✅ MuMu模拟器Pro launched successfully")
+            log.info("✅ MuMu模拟器Pro launched successfully")
             
-            # Wait for the emulator to start
-            print("⏳ Waiting for emulator interface to load...")
-            time.sleep(TIMING['MUMU_STARTUP_WAIT'])
-            return True
+            # Use the startup wait for template/extractor warmup
+            prewarm_thread = self._prewarm_in_background()
             
+            # Wait for the emulator to start (returns early once running)
+            log.info("⏳ Waiting for emulator interface to load...")
+            self._wait_for_app('MuMuPlayer', TIMING['MUMU_STARTUP_WAIT'])
+            prewarm_thread.join()
+            return True
+
         except subprocess.CalledProcessError as e:
-            print(f"❌ Failed to open MuMu模拟器Pro: {e}")
+            log.info(f"❌ Failed to open MuMu模拟器Pro: {e}")
             return False
     
     def execute_action(self, action):
         """Execute a single action from the action plan"""
-        action_type = action.get('action')
-        description = action.get('description', 'No description')
-        
-        print(f"📋 {description}")
-        
-        if action_type == 'click':
-            return self.execute_click_action(action)
-        elif action_type == 'avatar_keyword_click':
-            return self.execute_avatar_keyword_click_action(action)
-        elif action_type == 'wait':
-            return self.execute_wait_action(action)
-        elif action_type == 'open_app':
-            return self.execute_open_app_action(action)
-        elif action_type == 'open_mumu':
-            # Legacy support
-            return self.open_mumu()
-        else:
-            print(f"❌ Unknown action type: {action_type}")
+        # Parse the action dict into attribute form once - handlers then use
+        # plain attribute access instead of repeated dict lookups
+        action = Action.from_dict(action)
+
+        log.info(f"📋 {action.description}")
+
+        handler = self._DISPATCH.get(action.type)
+        if handler is None:
+            log.info(f"❌ Unknown action type: {action.type}")
             return False
+        result = handler(self, action)
+
+        # Optional per-action settle delay - the only remaining source of
+        # inter-action pausing now that pyautogui.PAUSE is zeroed
+        if result and action.pause > 0:
+            precise_sleep(action.pause)
+        return result
     
     def execute_avatar_keyword_click_action(self, action):
         """
@@ -121,328 +689,615 @@ class ActionAutomation:
             bool or dict: True/False for success/failure, or coordinates dict if return_coordinates=True
         """
         if not AVATAR_KEYWORD_DETECTION_AVAILABLE:
-            print("❌ Avatar keyword detection not available - missing avatar_message_block_detection or message_text_extractor")
+            log.info("❌ Avatar keyword detection not available - missing avatar_message_block_detection or message_text_extractor")
             return False
-        
+
+        _load_avatar_detection()
+
         if not self.text_extractor:
-            print("❌ Text extractor not initialized")
+            log.info("❌ Text extractor not initialized")
             return False
         
+        action = Action.from_dict(action)
+
         # Get action parameters
-        keywords = action.get('keywords')
+        keywords = action.keywords
         if not keywords:
-            print("❌ No keywords specified for avatar_keyword_click action")
+            log.info("❌ No keywords specified for avatar_keyword_click action")
             return False
         
         # Convert single keyword to list
         if isinstance(keywords, str):
             keywords = [keywords]
         
-        avatar_templates = action.get('avatar_templates')
+        avatar_templates = action.avatar_templates
         if not avatar_templates:
-            # Use all available templates
-            from avatar_message_block_detection import list_available_templates
-            avatar_templates = list_available_templates()
+            # Use all available templates (directory scanned once per run)
+            avatar_templates = _cached_templates()
             if not avatar_templates:
-                print("❌ No avatar templates available")
+                log.info("❌ No avatar templates available")
                 return False
         
-        confidence = action.get('confidence', 0.8)
-        return_coordinates = action.get('return_coordinates', False)
-        max_scroll_attempts = action.get('max_scroll_attempts', 6)
-        current_scroll_attempt = action.get('_current_scroll_attempt', 0)
-        
+        confidence = action.confidence
+        return_coordinates = action.return_coordinates
+        max_scroll_attempts = action.max_scroll_attempts
+
         try:
-            if current_scroll_attempt == 0:
-                print(f"🔍 Searching for avatars with keywords: {keywords}")
-                print(f"🎯 Using {len(avatar_templates)} avatar templates")
-            else:
-                print(f"🔍 Search attempt {current_scroll_attempt + 1} after scrolling...")
-            
-            # Find avatars using template matching
-            avatar_detections = find_avatars_with_templates(avatar_templates, confidence)
-            
-            if not avatar_detections:
-                print("❌ No avatars detected")
-                if current_scroll_attempt < max_scroll_attempts:
-                    return self._scroll_and_retry_keyword_search(action, current_scroll_attempt)
-                return False
-            
-            print(f"✅ Found {len(avatar_detections)} avatar(s)")
-            
-            # Check each detected avatar's message block for keywords
-            for i, detection in enumerate(avatar_detections, 1):
-                avatar = detection['avatar']
-                text_analysis = detection['text_analysis']
-                click_coords = detection['click_coordinates']['recommended']
-                
-                print(f"\n🔍 Checking avatar {i} for keywords...")
-                
-                # Extract text area image for keyword analysis
-                from avatar_message_block_detection import capture_chat_region
-                chat_image = capture_chat_region()
-                
-                # Get text area bounds
-                text_bounds = text_analysis['text_area_bounds']
-                text_area_image = chat_image[
-                    text_bounds['y']:text_bounds['y'] + text_bounds['height'],
-                    text_bounds['x']:text_bounds['x'] + text_bounds['width']
-                ]
-                
-                # Check for keywords using LLM
-                if len(keywords) == 1:
-                    keyword_result = self.text_extractor.contains_keyword(text_area_image, keywords[0])
-                else:
-                    keyword_result = self.text_extractor.contains_any_keyword(text_area_image, keywords)
-                
-                # Check if keywords were found
-                is_related = keyword_result.get('is_related', False) or keyword_result.get('is_related_to_any', False)
-                confidence_score = keyword_result.get('confidence', 0)
-                
-                # Debug output for keyword analysis
-                print(f"🔍 Keyword analysis result for avatar {i}:")
-                print(f"   is_related: {is_related}")
-                print(f"   confidence: {confidence_score}%")
-                print(f"   explanation: {keyword_result.get('explanation', 'No explanation')}")
-                if keyword_result.get('extracted_content'):
-                    print(f"   extracted_content: {keyword_result.get('extracted_content')}")
-                
+            log.info(f"🔍 Searching for avatars with keywords: {keywords}")
+            log.info(f"🎯 Using {len(avatar_templates)} avatar templates")
+
+            # Iterative search-scroll loop: one stack frame and one parsed
+            # action regardless of how many scrolls it takes
+            for attempt in range(max_scroll_attempts + 1):
+                if attempt > 0:
+                    log.info(f"🔍 Search attempt {attempt + 1} after scrolling...")
+
+                result = self._search_avatars_once(
+                    keywords, avatar_templates, confidence, return_coordinates
+                )
+                if result is not None:
+                    return result
+
+                if attempt < max_scroll_attempts and not self._scroll_chat(attempt):
+                    return False
+
+            log.info(f"❌ Exhausted all {max_scroll_attempts + 1} search attempts (including {max_scroll_attempts} scrolls)")
+            return False
+
+        except Exception as e:
+            log.info(f"❌ Avatar keyword click action failed: {e}")
+            return False
+
+    def _kw_cache_get(self, key):
+        """Cached keyword verdict for a crop hash, refreshed as most-recent"""
+        result = self._kw_cache.get(key)
+        if result is not None:
+            self._kw_cache.move_to_end(key)
+        return result
+
+    def _kw_cache_put(self, key, result):
+        """Record a keyword verdict, evicting the oldest entry when full"""
+        self._kw_cache[key] = result
+        self._kw_cache.move_to_end(key)
+        if len(self._kw_cache) > self.KEYWORD_CACHE_SIZE:
+            self._kw_cache.popitem(last=False)
+
+    def _search_avatars_once(self, keywords, avatar_templates, confidence, return_coordinates):
+        """Run one detection + keyword pass; returns None when nothing matched"""
+        # One capture feeds both template matching and the text-area crops
+        chat_image = self._capture_chat_image()
+        avatar_detections = find_avatars_with_templates(avatar_templates, confidence,
+                                                        chat_image=chat_image)
+
+        if not avatar_detections:
+            log.info("❌ No avatars detected")
+            return None
+
+        log.info(f"✅ Found {len(avatar_detections)} avatar(s)")
+
+        # Flatten the nested detection dicts into contiguous arrays once
+        # (SoA layout), so the remaining per-detection work is NumPy
+        # indexing and vector ops instead of repeated dict walks
+        bounds = np.array([
+            [d['text_analysis']['text_area_bounds'][k] for k in ('x', 'y', 'width', 'height')]
+            for d in avatar_detections
+        ], dtype=np.int32)
+        click_points = np.array([
+            [d['click_coordinates']['recommended'][k] for k in ('x', 'y')]
+            for d in avatar_detections
+        ], dtype=np.int32)
+
+        # Full-screen click coordinates for every detection in one pass
+        physical_clicks, logical_clicks = rescale_clicks(
+            click_points, CHAT_AREA[:2], SCALE_FACTOR
+        )
+
+        # Slice each avatar's text area out of the single capture
+        # (zero-copy views indexed from the bounds array)
+        text_area_images = [
+            chat_image[y:y + h, x:x + w]
+            for x, y, w, h in bounds
+        ]
+
+        # Downscale each crop to at most TEXT_CROP_MAX_HEIGHT rows before
+        # upload; INTER_AREA keeps the Chinese glyphs crisp while shedding
+        # most of the Retina-scale pixels the LLM doesn't need
+        cv2 = _load_cv2()
+        downscaled = []
+        for image in text_area_images:
+            height, width = image.shape[:2]
+            if height > self.TEXT_CROP_MAX_HEIGHT:
+                target_height = self.TEXT_CROP_MAX_HEIGHT
+                target_width = max(1, (width * target_height) // height)
+                image = cv2.resize(image, (target_width, target_height),
+                                   interpolation=cv2.INTER_AREA)
+            downscaled.append(image)
+
+        # Content-addressed verdict cache: scroll retries re-show most of
+        # the same message blocks a few pixels higher, and their perceptual
+        # hashes match, so the prior LLM verdict is reused in microseconds
+        keywords_key = tuple(sorted(keywords))
+        cache_keys = [
+            (_phash64(image), keywords_key) for image in text_area_images
+        ]
+        cached_results = [self._kw_cache_get(key) for key in cache_keys]
+
+        # Cheap OCR prefilter (~100ms/crop vs 500ms+ per LLM call): crops
+        # whose recognized text contains none of the keywords skip the LLM
+        prefilter_verdicts = [
+            _ocr_contains_any(image, keywords) if cached is None else None
+            for image, cached in zip(text_area_images, cached_results)
+        ]
+
+        # Encode every crop to JPEG exactly once - both LLM paths below
+        # reuse the encoded bytes instead of re-encoding per request;
+        # cached and prefiltered-out crops are dropped from the payload
+        encoded_crops = [
+            self.text_extractor.image_to_base64_jpeg(image)
+            if cached is None and verdict is not False else None
+            for image, cached, verdict in zip(downscaled, cached_results, prefilter_verdicts)
+        ]
+
+        matched_index = None
+        matched_result = None
+
+        batch_check = getattr(self.text_extractor, 'contains_any_keyword_batch', None)
+        if batch_check is not None:
+            # One multi-image LLM request covers every avatar, collapsing
+            # N network round-trips into 1
+            log.info(f"🔍 Checking all {len(avatar_detections)} avatar(s) in one batched LLM call...")
+            keyword_results = list(batch_check(encoded_crops, keywords))
+            for index, verdict in enumerate(prefilter_verdicts):
+                if verdict is False:
+                    keyword_results[index] = {
+                        'is_related_to_any': False,
+                        'keywords': keywords,
+                        'related_keywords': [],
+                        'confidence': 0,
+                        'explanation': 'OCR prefilter: no keyword text found in crop',
+                        'method': 'ocr_prefilter',
+                        'success': True
+                    }
+            for index, cached in enumerate(cached_results):
+                if cached is not None:
+                    keyword_results[index] = cached
+                elif keyword_results[index].get('success'):
+                    self._kw_cache_put(cache_keys[index], keyword_results[index])
+            for i, keyword_result in enumerate(keyword_results, 1):
+                is_related, confidence_score = self._report_keyword_result(i, keyword_result)
                 if is_related and confidence_score >= 70:  # Require at least 70% confidence
-                    print(f"✅ Keywords found in avatar {i} message block!")
-                    print(f"   Confidence: {confidence_score}%")
-                    if keyword_result.get('explanation'):
-                        print(f"   Explanation: {keyword_result['explanation']}")
-                    
-                    # Double-check before clicking (safety measure)
-                    if not is_related:
-                        print(f"❌ SAFETY CHECK FAILED: is_related is False but reached click section!")
+                    matched_index = i
+                    matched_result = keyword_result
+                    break
+        else:
+            # Fallback: check avatars concurrently - each keyword check is
+            # a network-bound LLM call, so threads let the HTTP
+            # round-trips overlap instead of running back to back
+            executor = ThreadPoolExecutor(max_workers=min(8, len(avatar_detections)))
+            futures = {}
+            try:
+                for i, encoded_crop in enumerate(encoded_crops, 1):
+                    cached = cached_results[i - 1]
+                    if cached is not None:
+                        is_related, confidence_score = self._report_keyword_result(i, cached)
+                        if is_related and confidence_score >= 70:
+                            matched_index = i
+                            matched_result = cached
+                            break
                         continue
-                    
-                    if confidence_score < 70:
-                        print(f"❌ SAFETY CHECK FAILED: confidence {confidence_score}% is too low!")
+                    if encoded_crop is None:
+                        log.info(f"⏭️  Skipping avatar {i} - OCR prefilter found no keyword text")
                         continue
-                    
-                    # Convert chat-relative coordinates to full-screen coordinates
-                    # The click_coords are relative to the chat area, need to add chat area offset
-                    from avatar_message_block_detection import CHAT_AREA, SCALE_FACTOR
-                    chat_x1, chat_y1, _, _ = CHAT_AREA
-                    
-                    # Chat-relative coordinates (physical coordinates within chat area)
-                    chat_relative_x = click_coords['x']
-                    chat_relative_y = click_coords['y']
-                    
-                    # Convert to full-screen physical coordinates
-                    physical_x = (chat_x1 * SCALE_FACTOR) + chat_relative_x
-                    physical_y = (chat_y1 * SCALE_FACTOR) + chat_relative_y
-                    
-                    # Convert to logical coordinates for clicking
-                    logical_x = physical_x // SCALE_FACTOR
-                    logical_y = physical_y // SCALE_FACTOR
-                    
-                    coordinates_result = {
-                        'x': logical_x,
-                        'y': logical_y,
-                        'physical_x': physical_x,
-                        'physical_y': physical_y,
-                        'chat_relative_x': chat_relative_x,
-                        'chat_relative_y': chat_relative_y,
-                        'avatar_info': {
-                            'template': avatar['template_name'],
-                            'confidence': avatar['confidence'],
-                            'position': (avatar['x'], avatar['y'])
-                        },
-                        'keyword_info': keyword_result
-                    }
-                    
-                    # Final safety check before clicking
-                    print(f"🎯 FINAL CHECK: About to click avatar {i}")
-                    print(f"   is_related: {is_related}")
-                    print(f"   confidence: {confidence_score}%")
-                    print(f"   Both conditions met: {is_related and confidence_score >= 70}")
-                    
-                    # Always click the avatar when keywords are found
-                    print(f"🖱️  Clicking avatar at full-screen logical coordinates ({logical_x}, {logical_y})")
-                    print(f"   (Chat-relative: {chat_relative_x}, {chat_relative_y})")
-                    pyautogui.click(logical_x, logical_y)
-                    print("✅ Avatar clicked successfully!")
-                    
-                    if return_coordinates:
-                        print(f"📍 Also returning coordinates:")
-                        print(f"   Chat-relative: ({chat_relative_x}, {chat_relative_y})")
-                        print(f"   Full-screen logical: ({logical_x}, {logical_y})")
-                        print(f"   Full-screen physical: ({physical_x}, {physical_y})")
-                        return coordinates_result
-                    else:
-                        return True
-                elif is_related and confidence_score < 70:
-                    print(f"⚠️  Keywords found but confidence too low: {confidence_score}%")
-                    print(f"   Skipping avatar {i} - need at least 70% confidence")
+                    log.debug("🔍 Checking avatar %s for keywords...", i)
+                    future = executor.submit(self.text_extractor.contains_any_keyword_bytes, encoded_crop, keywords)
+                    futures[future] = i
+
+                # Collect results as they complete, stopping at the first
+                # high-confidence hit (ties broken by original avatar order)
+                for future in as_completed(futures):
+                    i = futures[future]
+                    keyword_result = future.result()
+                    if keyword_result.get('success'):
+                        self._kw_cache_put(cache_keys[i - 1], keyword_result)
+
+                    is_related, confidence_score = self._report_keyword_result(i, keyword_result)
+
+                    if is_related and confidence_score >= 70:  # Require at least 70% confidence
+                        if matched_index is None or i < matched_index:
+                            matched_index = i
+                            matched_result = keyword_result
+                        # First confident hit wins - cancel remaining checks
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        break
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        if matched_index is not None:
+            i = matched_index
+            keyword_result = matched_result
+            detection = avatar_detections[i - 1]
+            avatar = detection['avatar']
+            click_coords = detection['click_coordinates']['recommended']
+            is_related = keyword_result.get('is_related', False) or keyword_result.get('is_related_to_any', False)
+            confidence_score = keyword_result.get('confidence', 0)
+
+            log.info(f"✅ Keywords found in avatar {i} message block!")
+            log.info(f"   Confidence: {confidence_score}%")
+            if keyword_result.get('explanation'):
+                log.info(f"   Explanation: {keyword_result['explanation']}")
+
+            # Double-check before clicking (safety measure)
+            if not is_related:
+                log.info(f"❌ SAFETY CHECK FAILED: is_related is False but reached click section!")
+            elif confidence_score < 70:
+                log.info(f"❌ SAFETY CHECK FAILED: confidence {confidence_score}% is too low!")
+            else:
+                # Chat-relative coordinates (physical coordinates within chat area)
+                chat_relative_x = click_coords['x']
+                chat_relative_y = click_coords['y']
+
+                # Full-screen coordinates were precomputed for all
+                # detections in one pass above
+                physical_x, physical_y = (int(v) for v in physical_clicks[i - 1])
+                logical_x, logical_y = (int(v) for v in logical_clicks[i - 1])
+
+                coordinates_result = {
+                    'x': logical_x,
+                    'y': logical_y,
+                    'physical_x': physical_x,
+                    'physical_y': physical_y,
+                    'chat_relative_x': chat_relative_x,
+                    'chat_relative_y': chat_relative_y,
+                    'avatar_info': {
+                        'template': avatar['template_name'],
+                        'confidence': avatar['confidence'],
+                        'position': (avatar['x'], avatar['y'])
+                    },
+                    'keyword_info': keyword_result
+                }
+
+                # Final safety check before clicking
+                log.debug("🎯 FINAL CHECK: About to click avatar %s", i)
+                log.debug("   is_related: %s, confidence: %s%%", is_related, confidence_score)
+
+                # Always click the avatar when keywords are found
+                log.info(f"🖱️  Clicking avatar at full-screen logical coordinates ({logical_x}, {logical_y})")
+                log.info(f"   (Chat-relative: {chat_relative_x}, {chat_relative_y})")
+                self._pace_clicks()
+                _fast_click(logical_x, logical_y)
+                self._last_click_time = time.monotonic()
+                log.info("✅ Avatar clicked successfully!")
+
+                if return_coordinates:
+                    log.info(f"📍 Also returning coordinates:")
+                    log.info(f"   Chat-relative: ({chat_relative_x}, {chat_relative_y})")
+                    log.info(f"   Full-screen logical: ({logical_x}, {logical_y})")
+                    log.info(f"   Full-screen physical: ({physical_x}, {physical_y})")
+                    return coordinates_result
                 else:
-                    print(f"❌ Keywords not found in avatar {i} (is_related={is_related})")
-                    print(f"   Skipping avatar {i} and continuing search")
-            
-            # No avatars with matching keywords found
-            print("❌ No avatars with matching keywords found")
-            if current_scroll_attempt < max_scroll_attempts:
-                return self._scroll_and_retry_keyword_search(action, current_scroll_attempt)
-            
-            print(f"❌ Exhausted all {max_scroll_attempts + 1} search attempts (including {max_scroll_attempts} scrolls)")
-            return False
-            
-        except Exception as e:
-            print(f"❌ Avatar keyword click action failed: {e}")
-            return False
-    
-    def _scroll_and_retry_keyword_search(self, action, current_scroll_attempt):
-        """Helper method to scroll down in chat area and retry keyword search"""
+                    return True
+
+        # No avatars with matching keywords found
+        log.info("❌ No avatars with matching keywords found")
+        return None
+
+    def _report_keyword_result(self, i, keyword_result):
+        """Log the keyword analysis for one avatar and return its verdict
+
+        Per-avatar detail goes to debug with lazy %s formatting, so the
+        strings are only built when verbose mode actually emits them;
+        only the one-line outcome stays at info level.
+        """
+        is_related = keyword_result.get('is_related', False) or keyword_result.get('is_related_to_any', False)
+        confidence_score = keyword_result.get('confidence', 0)
+
+        log.debug("\n🔍 Keyword analysis result for avatar %s:", i)
+        log.debug("   is_related: %s", is_related)
+        log.debug("   confidence: %s%%", confidence_score)
+        log.debug("   explanation: %s", keyword_result.get('explanation', 'No explanation'))
+        if keyword_result.get('extracted_content'):
+            log.debug("   extracted_content: %s", keyword_result.get('extracted_content'))
+
+        if is_related and confidence_score < 70:
+            log.info(f"⚠️  Avatar {i}: keywords found but confidence too low ({confidence_score}%)")
+        elif not (is_related and confidence_score >= 70):
+            log.info(f"❌ Keywords not found in avatar {i} - continuing search")
+
+        return is_related, confidence_score
+
+    def _scroll_chat(self, current_scroll_attempt):
+        """Scroll down in the chat area ahead of the next search pass"""
         if not AUTOMATION_AVAILABLE:
-            print("❌ Cannot scroll - automation libraries not available")
+            log.info("❌ Cannot scroll - automation libraries not available")
             return False
-        
-        # Get chat area for scrolling
-        from avatar_message_block_detection import CHAT_AREA
-        chat_x1, chat_y1, chat_x2, chat_y2 = CHAT_AREA
-        
+
+        _load_automation()
+
         # Calculate center of chat area for scrolling
+        chat_x1, chat_y1, chat_x2, chat_y2 = CHAT_AREA
         scroll_x = (chat_x1 + chat_x2) // 2
         scroll_y = (chat_y1 + chat_y2) // 2
-        
-        print(f"\n⬇️  No keywords found. Scrolling down in chat area (attempt {current_scroll_attempt + 1})")
-        print(f"   Scrolling at chat center: ({scroll_x}, {scroll_y})")
-        
+
+        log.info(f"\n⬇️  No keywords found. Scrolling down in chat area (attempt {current_scroll_attempt + 1})")
+        log.info(f"   Scrolling at chat center: ({scroll_x}, {scroll_y})")
+
         try:
             # Scroll down in the chat area (negative value scrolls down)
-            pyautogui.scroll(-3, x=scroll_x, y=scroll_y)
-            
-            # Wait a moment for the scroll to complete and content to load
-            time.sleep(1.5)
-            
-            # Create new action with incremented scroll attempt counter
-            retry_action = action.copy()
-            retry_action['_current_scroll_attempt'] = current_scroll_attempt + 1
-            
-            # Retry the search
-            return self.execute_avatar_keyword_click_action(retry_action)
-            
+            _fast_scroll(-3, scroll_x, scroll_y)
+
+            # The cached chat frame no longer reflects the screen
+            self._chat_image_cache = None
+
+            # Let the scroll settle and grab the next frame in the
+            # background; the next search pass blocks on it only when the
+            # frame is actually needed
+            self._prefetch_chat_capture(1.5)
+            return True
+
         except Exception as e:
-            print(f"❌ Scroll operation failed: {e}")
+            log.info(f"❌ Scroll operation failed: {e}")
             return False
     
     def execute_click_action(self, action):
         """Execute a click action"""
         if not AUTOMATION_AVAILABLE:
-            print("❌ Cannot click - automation libraries not available")
+            log.info("❌ Cannot click - automation libraries not available")
             return False
+
+        _load_automation()
         
-        coordinate_name = action.get('coordinate')
-        if isinstance(coordinate_name, str):
-            # Check if it's a named coordinate
-            if coordinate_name in COORDINATES:
-                coord_value = COORDINATES[coordinate_name]
-                
-                # Check if coordinate value is a PNG template path
-                if isinstance(coord_value, str) and coord_value.endswith('.png'):
-                    # Use PNG template matching to get coordinates
-                    if not ICON_DETECTION_AVAILABLE:
-                        print("❌ Cannot use icon detection - find_coordinates module not available")
-                        return False
-                    
-                    confidence = action.get('confidence', 0.8)
-                    
-                    try:
-                        print(f"🔍 Detecting coordinates for icon: {coord_value}")
-                        print(f"🎯 Confidence threshold: {confidence}")
-                        
-                        coords = find_icon_coordinates_scaled(
-                            template_path=coord_value,
-                            confidence=confidence
-                        )
-                        
-                        if coords:
-                            x, y = coords
-                            print(f"✅ Icon detected at coordinates: ({x}, {y})")
-                        else:
-                            print("❌ Failed to detect icon coordinates")
-                            return False
-                            
-                    except Exception as e:
-                        print(f"❌ Icon detection failed: {e}")
-                        return False
-                else:
-                    # Regular coordinate tuple
-                    x, y = coord_value
-            else:
-                print(f"❌ Unknown coordinate name: {coordinate_name}")
+        self._last_icon_cache_key = None
+
+        # The coordinate reference was classified once at parse time
+        template_path = action.resolved_template
+        roi = action.resolved_roi
+        if template_path is not None:
+            # Use PNG template matching to get coordinates
+            if not ICON_DETECTION_AVAILABLE:
+                log.info("❌ Cannot use icon detection - find_coordinates module not available")
                 return False
-        elif isinstance(coordinate_name, (list, tuple)) and len(coordinate_name) == 2:
-            # Direct coordinate tuple
-            x, y = coordinate_name
+
+            _load_icon_detection()
+
+            confidence = action.confidence
+
+            # Fingerprint the screen state so a stable UI can reuse
+            # previously detected coordinates without re-matching
+            screen_hash = None
+            try:
+                screen_hash = _screen_ahash(roi)
+            except Exception as e:
+                self.log(f"Screen hash failed: {e}")
+
+            cached_coords = None
+            if screen_hash is not None:
+                cached_coords = self._icon_cache_lookup(template_path, screen_hash)
+                self._last_icon_cache_key = (template_path, screen_hash)
+
+            if cached_coords is not None:
+                x, y = cached_coords
+                log.info(f"✅ Icon coordinates from cache: ({x}, {y})")
+            else:
+                try:
+                    log.info(f"🔍 Detecting coordinates for icon: {template_path}")
+                    log.info(f"🎯 Confidence threshold: {confidence}")
+
+                    coords = find_icon_coordinates_scaled(
+                        template_path=template_path,
+                        confidence=confidence,
+                        roi=roi
+                    )
+
+                    if coords:
+                        x, y = coords
+                        log.info(f"✅ Icon detected at coordinates: ({x}, {y})")
+                        if screen_hash is not None:
+                            self._icon_cache_store(template_path, screen_hash, coords)
+                    else:
+                        log.info("❌ Failed to detect icon coordinates")
+                        return False
+
+                except Exception as e:
+                    log.info(f"❌ Icon detection failed: {e}")
+                    return False
+        elif action.resolved_xy is not None:
+            x, y = action.resolved_xy
+        elif isinstance(action.coordinate, str):
+            log.info(f"❌ Unknown coordinate name: {action.coordinate}")
+            return False
         else:
-            print(f"❌ Invalid coordinate format: {coordinate_name}")
+            log.info(f"❌ Invalid coordinate format: {action.coordinate}")
             return False
         
         try:
             self.log(f"Clicking at ({x}, {y})")
-            print(f"🖱️  Clicking at ({x}, {y})")
-            pyautogui.click(x, y)
-            print("✅ Click successful!")
+            log.info(f"🖱️  Clicking at ({x}, {y})")
+            self._pace_clicks()
+            _fast_click(x, y)
+            self._last_click_time = time.monotonic()
+            log.info("✅ Click successful!")
             return True
             
         except Exception as e:
-            print(f"❌ Click failed: {e}")
+            log.info(f"❌ Click failed: {e}")
+            # A failed click means the cached coordinates are untrustworthy
+            if self._last_icon_cache_key is not None:
+                self._icon_cache_evict(self._last_icon_cache_key)
             return False
-    
+
+
+    def _resolve_wait_template(self, until):
+        """Resolve a wait action's 'until' key to a template image path"""
+        coord_value = COORDINATES.get(until, until)
+        if isinstance(coord_value, dict):
+            coord_value = coord_value.get('template')
+        if isinstance(coord_value, str) and coord_value.endswith('.png'):
+            return coord_value
+        return None
 
     def execute_wait_action(self, action):
-        """Execute a wait action"""
-        duration = action.get('duration', 1)
-        
+        """Execute a wait action
+
+        With an 'until' key naming a coordinate template, the duration is a
+        timeout: the screen is polled and the wait ends as soon as the
+        template appears. Otherwise it is a plain fixed sleep.
+        """
+        duration = action.duration
+
         try:
-            print(f"⏳ Waiting {duration} seconds...")
-            time.sleep(duration)
-            print("✅ Wait completed!")
+            deadline = time.monotonic() + duration
+
+            probe = None
+            if action.until and ICON_DETECTION_AVAILABLE:
+                _load_icon_detection()
+                template_path = self._resolve_wait_template(action.until)
+                if template_path is not None:
+                    log.info(f"⏳ Waiting up to {duration}s for {action.until}...")
+                    probe = lambda: find_icon_coordinates_scaled(
+                        template_path=template_path, confidence=action.confidence
+                    ) is not None
+                else:
+                    log.info(f"❌ Unknown wait target: {action.until}")
+
+            if probe is None:
+                log.info(f"⏳ Waiting {duration} seconds...")
+
+            if self._wait_until(deadline, probe, interval=0.5):
+                log.info(f"✅ {action.until} appeared - wait ended early!")
+            else:
+                log.info("✅ Wait completed!")
             return True
-            
+
         except Exception as e:
-            print(f"❌ Wait failed: {e}")
+            log.info(f"❌ Wait failed: {e}")
             return False
     
+    def execute_click_until_gone_action(self, action):
+        """Click a template repeatedly until it disappears from screen
+
+        Replaces stacks of identical click steps: each round locates the
+        template, clicks it, and waits `interval` before re-checking. The
+        loop exits on the first miss, so the common case of one effective
+        click pays for one search instead of a fixed number of rounds.
+        """
+        if not AUTOMATION_AVAILABLE or not ICON_DETECTION_AVAILABLE:
+            log.info("❌ Cannot click - automation libraries not available")
+            return False
+
+        template_path = self._resolve_wait_template(action.coordinate)
+        if template_path is None:
+            log.info(f"❌ Unknown click_until_gone target: {action.coordinate}")
+            return False
+
+        _load_automation()
+        _load_icon_detection()
+
+        clicks = 0
+        for attempt in range(action.max_attempts):
+            coords = find_icon_coordinates_scaled(
+                template_path=template_path, confidence=action.confidence
+            )
+            if coords is None:
+                break
+            x, y = coords
+            log.info(f"🖱️  Clicking {action.coordinate} at ({x}, {y}) (round {attempt + 1})")
+            self._pace_clicks()
+            _fast_click(x, y)
+            self._last_click_time = time.monotonic()
+            clicks += 1
+            precise_sleep(action.interval)
+
+        if clicks:
+            log.info(f"✅ {action.coordinate} clicked {clicks} time(s) until gone")
+        else:
+            log.info(f"ℹ️ {action.coordinate} not on screen - nothing to click")
+        return True
+
+    def execute_wait_until_action(self, action):
+        """Execute a wait_until action - poll for a template, capped by a timeout
+
+        Unlike a fixed wait, the plan resumes the moment the named
+        coordinate's template is found on screen, so boot and load waits
+        cost actual-case time instead of worst-case. 'min_wait' sleeps
+        unconditionally first, debouncing transition animations that can
+        briefly show the target before it is clickable.
+        """
+        target = action.coordinate
+        timeout = action.timeout
+
+        if action.min_wait > 0:
+            time.sleep(action.min_wait)
+
+        if not ICON_DETECTION_AVAILABLE:
+            log.info("❌ Cannot poll for template - falling back to fixed wait")
+            time.sleep(max(timeout - action.min_wait, 0))
+            return True
+
+        template_path = self._resolve_wait_template(target)
+        if template_path is None:
+            if target in COORDINATES:
+                # Direct-coordinate mode: nothing to poll for, so the
+                # timeout degrades to the old fixed wait
+                log.info(f"⏳ No template for {target} - waiting {timeout}s")
+                time.sleep(max(timeout - action.min_wait, 0))
+                return True
+            log.info(f"❌ Unknown wait_until target: {target}")
+            return False
+
+        _load_icon_detection()
+        log.info(f"⏳ Waiting up to {timeout}s for {target}...")
+        probe = lambda: find_icon_coordinates_scaled(
+            template_path=template_path, confidence=action.confidence
+        ) is not None
+
+        deadline = time.monotonic() + max(timeout - action.min_wait, 0)
+        if self._wait_until(deadline, probe, interval=action.poll_interval):
+            log.info(f"✅ {target} appeared - continuing!")
+        else:
+            log.info(f"⚠️ {target} not seen within {timeout}s - continuing anyway")
+        return True
+
     def execute_open_app_action(self, action):
         """Execute an open application action"""
-        app_name = action.get('app')
+        app_name = action.app
         
         if not app_name:
-            print("❌ No app specified in open_app action")
+            log.info("❌ No app specified in open_app action")
             return False
         
         if app_name not in APPLICATION_PATHS:
-            print(f"❌ Unknown application: {app_name}")
-            print(f"Available apps: {', '.join(APPLICATION_PATHS.keys())}")
+            log.info(f"❌ Unknown application: {app_name}")
+            log.info(f"Available apps: {', '.join(APPLICATION_PATHS.keys())}")
             return False
         
         app_path = APPLICATION_PATHS[app_name]
-        
-        if not os.path.exists(app_path):
-            print(f"❌ Application not found: {app_path}")
+
+        if not self._app_exists(app_name):
+            log.info(f"❌ Application not found: {app_path}")
             return False
         
         try:
-            print(f"🚀 Opening {app_name} from {app_path}")
+            log.info(f"🚀 Opening {app_name} from {app_path}")
             subprocess.run(["open", app_path], check=True)
-            print(f"✅ {app_name} launched successfully")
+            log.info(f"✅ {app_name} launched successfully")
             
-            # Wait for the application to start
+            # Use the startup wait for template/extractor warmup
+            prewarm_thread = self._prewarm_in_background()
+            
+            # Wait for the application to start (returns early once running)
+            app_process = os.path.splitext(os.path.basename(app_path))[0]
             if app_name == 'mumu':
-                print("⏳ Waiting for emulator interface to load...")
-                time.sleep(TIMING['MUMU_STARTUP_WAIT'])
+                log.info("⏳ Waiting for emulator interface to load...")
+                self._wait_for_app(app_process, TIMING['MUMU_STARTUP_WAIT'])
             else:
-                print("⏳ Waiting for application to load...")
-                time.sleep(1)  # Default 1 second wait for other apps
+                log.info("⏳ Waiting for application to load...")
+                self._wait_for_app(app_process, 1)  # Default 1 second cap for other apps
             
+            prewarm_thread.join()
             return True
             
         except subprocess.CalledProcessError as e:
-            print(f"❌ Failed to open {app_name}: {e}")
+            log.info(f"❌ Failed to open {app_name}: {e}")
             return False
     
     def find_avatar_coordinates_for_keyword(self, keywords, avatar_templates=None, confidence=0.8):
@@ -457,95 +1312,155 @@ class ActionAutomation:
         Returns:
             dict or None: Coordinates and metadata if found, None otherwise
         """
-        action = {
-            'action': 'avatar_keyword_click',
-            'keywords': keywords,
-            'avatar_templates': avatar_templates,
-            'confidence': confidence,
-            'return_coordinates': True,
-            'description': f'Find coordinates for keyword: {keywords}'
-        }
-        
+        action = Action(
+            type='avatar_keyword_click',
+            keywords=keywords,
+            avatar_templates=avatar_templates,
+            confidence=confidence,
+            return_coordinates=True,
+            description=f'Find coordinates for keyword: {keywords}'
+        )
+
         return self.execute_avatar_keyword_click_action(action)
     
     def execute_action_plan(self, plan_name, parameters=None):
         """Execute a complete action plan with optional parameter substitution"""
         if plan_name not in ACTION_PLANS:
-            print(f"❌ Unknown action plan: {plan_name}")
-            print(f"Available plans: {', '.join(ACTION_PLANS.keys())}")
+            log.info(f"❌ Unknown action plan: {plan_name}")
+            log.info(f"Available plans: {', '.join(ACTION_PLANS.keys())}")
             return False
 
-        action_plan = ACTION_PLANS[plan_name]
         parameters = parameters or {}
 
-        # Make a copy of the action plan and substitute parameters
-        substituted_plan = []
-        for action in action_plan:
-            substituted_action = {}
-            for key, value in action.items():
-                if isinstance(value, str):
-                    # Substitute parameters in string values
-                    substituted_value = value
-                    for param_key, param_value in parameters.items():
-                        placeholder = f'{{{param_key}}}'
-                        substituted_value = substituted_value.replace(placeholder, str(param_value))
-                    substituted_action[key] = substituted_value
-                else:
-                    substituted_action[key] = value
-            substituted_plan.append(substituted_action)
+        if not parameters:
+            # No substitution needed - run the plan precompiled at import time
+            substituted_plan = _COMPILED_PLANS[plan_name]
+        else:
+            # Substitute all placeholders in one compiled-regex pass per
+            # string instead of one str.replace pass per parameter
+            pattern = re.compile('|'.join(
+                re.escape(f'{{{param_key}}}') for param_key in parameters
+            ))
+            repl = lambda match: str(parameters[match.group(0)[1:-1]])
+
+            substituted_plan = []
+            for action in ACTION_PLANS[plan_name]:
+                substituted_action = {
+                    key: pattern.sub(repl, value)
+                    if isinstance(value, str) and '{' in value else value
+                    for key, value in action.items()
+                }
+                substituted_plan.append(Action.from_dict(substituted_action))
 
-        print("🎮 Starting Action-Based Game Automation")
-        print("=" * 50)
-        print(f"📋 Executing plan: '{plan_name}'")
+        log.info("🎮 Starting Action-Based Game Automation")
+        log.info("=" * 50)
+        log.info(f"📋 Executing plan: '{plan_name}'")
         if parameters:
-            print(f"🔧 Parameters: {parameters}")
-        print(f"📊 Total actions: {len(substituted_plan)}")
-        print("-" * 50)
+            log.info(f"🔧 Parameters: {parameters}")
+        log.info(f"📊 Total actions: {len(substituted_plan)}")
+        log.info("-" * 50)
 
-        for i, action in enumerate(substituted_plan, 1):
-            print(f"\n🔄 Step {i}/{len(substituted_plan)}:")
+        # Move one-time avatar-detection costs out of the step loop
+        if any(action.type == 'avatar_keyword_click' for action in substituted_plan):
+            self.prewarm()
 
-            if not self.execute_action(action):
-                print(f"❌ Failed at step {i}. Stopping execution.")
-                return False
+        # Suspend pyautogui's blanket inter-call pause for the plan run;
+        # _pace_clicks reinstates the gap only between consecutive clicks
+        if AUTOMATION_AVAILABLE:
+            _load_automation()
+        saved_pause = pyautogui.PAUSE if AUTOMATION_AVAILABLE else None
+        if AUTOMATION_AVAILABLE:
+            pyautogui.PAUSE = 0
+
+        try:
+            if not parameters and plan_name in _SPECIALIZED_PLANS:
+                # Fixed plan: run the code-generated straight-line version
+                if not _SPECIALIZED_PLANS[plan_name](self):
+                    return False
+            else:
+                for i, action in enumerate(substituted_plan, 1):
+                    log.info(f"\n🔄 Step {i}/{len(substituted_plan)}:")
+
+                    success = self.execute_action(action)
+                    flush_log()  # one batched write per step
+
+                    if not success:
+                        log.info(f"❌ Failed at step {i}. Stopping execution.")
+                        flush_log()
+                        return False
+        finally:
+            if AUTOMATION_AVAILABLE:
+                pyautogui.PAUSE = saved_pause
 
-        print("\n" + "=" * 50)
-        print("🎉 Action plan completed successfully!")
+        log.info("\n" + "=" * 50)
+        log.info("🎉 Action plan completed successfully!")
+        flush_log()  # don't leave the closing lines buffered past return
         return True
     
     def list_available_plans(self):
         """List all available action plans"""
-        print("📋 Available Action Plans:")
-        print("=" * 40)
-        
-        for plan_name, actions in ACTION_PLANS.items():
-            print(f"\n🎯 {plan_name}:")
-            for i, action in enumerate(actions, 1):
-                action_type = action.get('action', 'unknown')
-                description = action.get('description', 'No description')
-                
-                if action_type == 'click':
-                    coord = action.get('coordinate', 'unknown')
-                    print(f"   {i}. Click {coord} - {description}")
-                elif action_type == 'avatar_keyword_click':
-                    keywords = action.get('keywords', 'unknown')
-                    print(f"   {i}. Avatar keyword click [{keywords}] - {description}")
-                elif action_type == 'wait':
-                    duration = action.get('duration', 'unknown')
-                    print(f"   {i}. Wait {duration}s - {description}")
-                elif action_type == 'open_app':
-                    app = action.get('app', 'unknown')
-                    print(f"   {i}. Open {app} - {description}")
-                else:
-                    print(f"   {i}. {action_type} - {description}")
-    
+        log.info(_rendered_plans_listing())
+
     def list_coordinates(self):
         """List all available named coordinates"""
-        print("📍 Available Coordinates:")
-        print("=" * 30)
+        log.info("📍 Available Coordinates:")
+        log.info("=" * 30)
         
         for name, (x, y) in COORDINATES.items():
-            print(f"   {name}: ({x}, {y})")
+            log.info(f"   {name}: ({x}, {y})")
+
+ActionAutomation._DISPATCH = {
+    'click': ActionAutomation.execute_click_action,
+    'avatar_keyword_click': ActionAutomation.execute_avatar_keyword_click_action,
+    'wait': ActionAutomation.execute_wait_action,
+    'wait_until': ActionAutomation.execute_wait_until_action,
+    'click_until_gone': ActionAutomation.execute_click_until_gone_action,
+    'open_app': ActionAutomation.execute_open_app_action,
+    'open_mumu': lambda self, action: self.open_mumu(),  # Legacy support
+}
+
+def _specialize_plan(compiled_actions):
+    """Generate a straight-line runner for one fixed plan (partial evaluation)
+
+    Emits a block of plain Python per step with the step's handler and
+    parsed Action prebound in the generated function's globals, then
+    exec()s it. Running the plan therefore does no dispatch-table lookups,
+    type branching or loop bookkeeping - just direct calls in sequence.
+    Returns None for plans containing an unknown action type so the caller
+    falls back to the interpreting loop, which reports the error.
+    """
+    total = len(compiled_actions)
+    namespace = {'log': log, 'flush_log': flush_log, 'precise_sleep': precise_sleep}
+    lines = ['def _run(self):']
+    for i, action in enumerate(compiled_actions, 1):
+        handler = ActionAutomation._DISPATCH.get(action.type)
+        if handler is None:
+            return None
+        namespace[f'_handler_{i}'] = handler
+        namespace[f'_action_{i}'] = action
+        step_header = f'\n🔄 Step {i}/{total}:'
+        description = f'📋 {action.description}'
+        failure = f'❌ Failed at step {i}. Stopping execution.'
+        lines.append(f'    log.info({step_header!r})')
+        lines.append(f'    log.info({description!r})')
+        lines.append(f'    if not _handler_{i}(self, _action_{i}):')
+        lines.append(f'        log.info({failure!r})')
+        lines.append('        flush_log()')
+        lines.append('        return False')
+        if action.pause > 0:
+            lines.append(f'    precise_sleep({action.pause!r})')
+        lines.append('    flush_log()')
+    lines.append('    return True')
+    exec('\n'.join(lines), namespace)
+    return namespace['_run']
+
+# Plans run without parameters are fully known at import time - compile each
+# one to a specialized runner; parameterised runs keep the interpreting loop
+_SPECIALIZED_PLANS = {}
+for _plan_name, _plan_actions in _COMPILED_PLANS.items():
+    _plan_runner = _specialize_plan(_plan_actions)
+    if _plan_runner is not None:
+        _SPECIALIZED_PLANS[_plan_name] = _plan_runner
 
 def main():
     parser = argparse.ArgumentParser(description="Action-Based Game Automation Tool")
@@ -6,12 +6,23 @@ Find specific avatars using template matching, then analyze text areas to their
 
 import pyautogui
 import cv2
+import functools
 import numpy as np
 import os
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Tuple, List, Dict, Optional
 
+# Optional fast screen capture - mss grabs just the requested rectangle
+# through CoreGraphics instead of screenshotting the whole display
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
 # Configuration
 CHAT_AREA = (660, 145, 935, 496)  # Logical coordinates
 SCALE_FACTOR = 2
@@ -25,6 +36,193 @@ TEXT_AREA_WIDTH = 420   # Width of text area to analyze (930-720) * 2
 TEXT_AREA_HEIGHT = 222  # Height of text area (458-347) * 2
 TEXT_AREA_HEIGHT_PADDING = 0  # No padding since we have exact height
 
+
+# Make sure OpenCV's optimized (SIMD/IPP) code paths are on and its
+# internal thread pool can use every core - both default on in official
+# wheels, but a locally built cv2 may ship with them disabled
+cv2.setUseOptimized(True)
+cv2.setNumThreads(os.cpu_count() or 4)
+for _line in cv2.getBuildInformation().splitlines():
+    if _line.strip().startswith('Intel IPP:') and _line.strip().endswith('NO'):
+        print("⚠️ OpenCV built without Intel IPP - matchTemplate will be slower; "
+              "consider the official opencv-python wheel")
+        break
+
+# Offload template matching to the GPU through OpenCV's OpenCL backend
+# (cv2.UMat) when one is available - on Apple Silicon the integrated GPU
+# runs the normalized cross-correlation several times faster than one core
+OPENCL_AVAILABLE = cv2.ocl.haveOpenCL()
+
+# Grayscale templates uploaded to the GPU, keyed by (path, mtime_ns)
+_UMAT_TEMPLATE_CACHE = {}
+
+def _template_mtime_ns(template_path: str) -> Optional[int]:
+    """st_mtime_ns of a template file, or None if it is unreadable"""
+    try:
+        return os.stat(template_path).st_mtime_ns
+    except OSError:
+        return None
+
+@functools.lru_cache(maxsize=64)
+def _load_template(template_path: str, mtime_ns: int) -> Optional[np.ndarray]:
+    """Decode a template image, cached per (path, mtime) so an edited
+    template file on disk invalidates its stale entry automatically"""
+    return cv2.imread(template_path, cv2.IMREAD_COLOR)
+
+@functools.lru_cache(maxsize=64)
+def _load_template_gray(template_path: str, mtime_ns: int) -> Optional[np.ndarray]:
+    """Grayscale copy of a template, converted once per file version"""
+    template = _load_template(template_path, mtime_ns)
+    if template is None:
+        return None
+    return cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+
+@functools.lru_cache(maxsize=64)
+def _load_template_gray_half(template_path: str, mtime_ns: int) -> Optional[np.ndarray]:
+    """Half-scale grayscale template for the coarse pyramid pass"""
+    gray = _load_template_gray(template_path, mtime_ns)
+    if gray is None:
+        return None
+    return cv2.pyrDown(gray)
+
+def load_template_gray(template_path: str) -> Optional[np.ndarray]:
+    """Grayscale copy of a template, re-read only when the file changes"""
+    mtime_ns = _template_mtime_ns(template_path)
+    if mtime_ns is None:
+        return None
+    return _load_template_gray(template_path, mtime_ns)
+
+def _template_umat(template_path: str) -> Optional["cv2.UMat"]:
+    """GPU-side grayscale copy of a template, uploaded on first use"""
+    mtime_ns = _template_mtime_ns(template_path)
+    if mtime_ns is None:
+        return None
+    key = (template_path, mtime_ns)
+    umat = _UMAT_TEMPLATE_CACHE.get(key)
+    if umat is None:
+        gray = _load_template_gray(template_path, mtime_ns)
+        if gray is None:
+            return None
+        umat = cv2.UMat(gray)
+        _UMAT_TEMPLATE_CACHE[key] = umat
+    return umat
+
+# One detection row per match - field access (row['x']) reads like the
+# old per-match dicts, but thousands of low-threshold matches cost one
+# array allocation instead of one Python dict each
+_DET_DTYPE = np.dtype([
+    ('template_name', 'U64'),
+    ('x', 'i4'), ('y', 'i4'),
+    ('width', 'i4'), ('height', 'i4'),
+    ('confidence', 'f4'),
+    ('center_x', 'i4'), ('center_y', 'i4'),
+])
+
+# Coarse-to-fine matching parameters: half-scale templates below the
+# minimum lose too much detail, the slack relaxes the coarse threshold
+# so borderline matches survive to refinement, and the pad bounds the
+# full-resolution window searched around each coarse hit
+_PYR_MIN_TEMPLATE = 8
+_PYR_COARSE_SLACK = 0.05
+_PYR_REFINE_PAD = 8
+
+def _match_template_pyramid(frame: np.ndarray, template: np.ndarray,
+                            template_path: str, confidence: float,
+                            frame_half: Optional[np.ndarray] = None):
+    """Coarse-to-fine template matching on grayscale data
+    
+    Matches at half scale first (a quarter of the multiply-accumulates),
+    then refines each coarse candidate with a full-resolution match in a
+    small padded window, so full-precision scores come out the other end.
+    
+    Returns:
+        Tuple of (xs, ys, confs, best_score) arrays of full-res matches
+    """
+    template_height, template_width = template.shape[:2]
+    
+    mtime_ns = _template_mtime_ns(template_path)
+    template_half = None
+    if mtime_ns is not None and min(template_height, template_width) // 2 >= _PYR_MIN_TEMPLATE:
+        template_half = _load_template_gray_half(template_path, mtime_ns)
+    
+    if template_half is None:
+        # Template too small to survive pyrDown - match at full scale
+        result = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+        _, best_score, _, _ = cv2.minMaxLoc(result)
+        ys, xs = np.where(result >= confidence)
+        return xs, ys, result[ys, xs], best_score
+    
+    if frame_half is None:
+        frame_half = cv2.pyrDown(frame)
+    
+    coarse = cv2.matchTemplate(frame_half, template_half, cv2.TM_CCOEFF_NORMED)
+    _, best_score, _, _ = cv2.minMaxLoc(coarse)
+    coarse_ys, coarse_xs = np.where(coarse >= confidence - _PYR_COARSE_SLACK)
+    
+    frame_height, frame_width = frame.shape[:2]
+    hits = {}
+    for cx, cy in zip(coarse_xs, coarse_ys):
+        x0 = max(int(cx) * 2 - _PYR_REFINE_PAD, 0)
+        y0 = max(int(cy) * 2 - _PYR_REFINE_PAD, 0)
+        x1 = min(int(cx) * 2 + template_width + _PYR_REFINE_PAD, frame_width)
+        y1 = min(int(cy) * 2 + template_height + _PYR_REFINE_PAD, frame_height)
+        if x1 - x0 < template_width or y1 - y0 < template_height:
+            continue
+        local = cv2.matchTemplate(frame[y0:y1, x0:x1], template, cv2.TM_CCOEFF_NORMED)
+        _, local_best, _, _ = cv2.minMaxLoc(local)
+        best_score = max(best_score, local_best)
+        local_ys, local_xs = np.where(local >= confidence)
+        # Overlapping refine windows can rediscover the same full-res
+        # position - keep each position's best score once
+        for lx, ly in zip(local_xs, local_ys):
+            pt = (x0 + int(lx), y0 + int(ly))
+            score = float(local[ly, lx])
+            if score > hits.get(pt, 0.0):
+                hits[pt] = score
+    
+    if not hits:
+        empty = np.empty(0, dtype=np.int32)
+        return empty, empty, np.empty(0), best_score
+    
+    points = np.array(list(hits.keys()), dtype=np.int32)
+    confs = np.fromiter(hits.values(), dtype=np.float64, count=len(hits))
+    return points[:, 0], points[:, 1], confs, best_score
+
+def prepare_match_frame(chat_image: np.ndarray):
+    """Convert a captured chat frame once into matchTemplate's input form
+
+    Grayscale (and uploaded to the GPU when OpenCL is available), shared
+    by every template matched against this frame.
+    """
+    chat_gray = cv2.cvtColor(chat_image, cv2.COLOR_BGR2GRAY)
+    return cv2.UMat(chat_gray) if OPENCL_AVAILABLE else chat_gray
+
+def load_template(template_path: str) -> Optional[np.ndarray]:
+    """Load an avatar template, reusing the decoded image until the
+    file's mtime changes on disk"""
+    mtime_ns = _template_mtime_ns(template_path)
+    if mtime_ns is None:
+        return None
+    return _load_template(template_path, mtime_ns)
+
+def preload_templates(template_paths: List[str]):
+    """Decode the given templates into the cache ahead of the hot loop"""
+    for template_path in template_paths:
+        if os.path.exists(template_path):
+            load_template(template_path)
+
+def _save_debug_image(path: str, image: np.ndarray):
+    """Write a debug image on a background thread
+
+    PNG encoding takes tens of milliseconds for a full chat frame; the
+    image is copied first so the capture buffer can be reused while the
+    write completes off the critical path.
+    """
+    threading.Thread(target=cv2.imwrite,
+                     args=(path, image.copy(),
+                           [cv2.IMWRITE_PNG_COMPRESSION, 1]),
+                     daemon=True).start()
+
 def setup_directories():
     """Create necessary directories"""
     os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -32,6 +230,22 @@ def setup_directories():
     print(f"📁 Output directory: {OUTPUT_DIR}")
     print(f"📁 Avatar directory: {AVATAR_TEMPLATES_DIR}")
 
+# Persistent mss instance - keeping it alive reuses the display context
+# instead of recreating it on every capture
+_SCT = None
+
+# Persistent BGR frame buffer reused across captures. Each grab
+# overwrites it, so callers that need a frame beyond the next capture
+# must copy - the detection pipeline consumes frames before recapturing.
+_FRAME_BUF = None
+
+def _screen_grabber():
+    """Shared mss instance, created on first capture"""
+    global _SCT
+    if _SCT is None:
+        _SCT = mss.mss()
+    return _SCT
+
 def capture_chat_region() -> np.ndarray:
     """Capture chat region with scaling"""
     x1, y1, x2, y2 = CHAT_AREA
@@ -45,6 +259,23 @@ def capture_chat_region() -> np.ndarray:
     print(f"📸 Capturing chat region: logical ({x1}, {y1}) to ({x2}, {y2})")
     print(f"📸 Physical coordinates: ({physical_x1}, {physical_y1}) to ({physical_x2}, {physical_y2})")
     
+    if MSS_AVAILABLE:
+        # Grab only the chat rectangle - the full-screen bitmap is never
+        # materialized, unlike pyautogui.screenshot() + crop
+        raw = _screen_grabber().grab({
+            'left': x1, 'top': y1,
+            'width': x2 - x1, 'height': y2 - y1
+        })
+        # The raw capture is already BGRA, so dropping the alpha plane
+        # yields BGR directly - no cvtColor channel swap needed
+        bgra = np.frombuffer(raw.bgra, dtype=np.uint8)
+        bgra = bgra.reshape(raw.height, raw.width, 4)
+        global _FRAME_BUF
+        if _FRAME_BUF is None or _FRAME_BUF.shape[:2] != (raw.height, raw.width):
+            _FRAME_BUF = np.empty((raw.height, raw.width, 3), dtype=np.uint8)
+        np.copyto(_FRAME_BUF, bgra[:, :, :3])
+        return _FRAME_BUF
+    
     full_screenshot = pyautogui.screenshot()
     chat_region = full_screenshot.crop((physical_x1, physical_y1, physical_x2, physical_y2))
     
@@ -54,7 +285,8 @@ def capture_chat_region() -> np.ndarray:
     return chat_cv
 
 def find_avatar_by_template(chat_image: np.ndarray, template_path: str, 
-                           confidence: float = 0.8) -> List[Dict]:
+                           confidence: float = 0.8, frame=None,
+                           frame_half: Optional[np.ndarray] = None) -> np.ndarray:
     """
     Find avatar using template matching
     
@@ -62,52 +294,62 @@ def find_avatar_by_template(chat_image: np.ndarray, template_path: str,
         chat_image: Screenshot of chat area
         template_path: Path to avatar template image
         confidence: Matching confidence threshold
+        frame: Optional output of prepare_match_frame(chat_image), so
+               callers matching several templates convert/upload only once
+        frame_half: Optional cv2.pyrDown of the grayscale frame, shared
+               across templates for the coarse pyramid pass
         
     Returns:
-        List of detected avatar locations with metadata
+        Structured array (_DET_DTYPE) of detected avatar locations
     """
     if not os.path.exists(template_path):
         print(f"❌ Template not found: {template_path}")
-        return []
+        return np.empty(0, dtype=_DET_DTYPE)
     
-    # Load template
-    template = cv2.imread(template_path, cv2.IMREAD_COLOR)
+    # Load template (cached after the first decode, matched in grayscale)
+    template = load_template_gray(template_path)
     if template is None:
         print(f"❌ Failed to load template: {template_path}")
-        return []
+        return np.empty(0, dtype=_DET_DTYPE)
     
     template_height, template_width = template.shape[:2]
     
-    # Perform template matching
-    result = cv2.matchTemplate(chat_image, template, cv2.TM_CCOEFF_NORMED)
-    
-    # Find the best match confidence regardless of threshold
-    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-    best_confidence = max_val
+    if frame is None:
+        frame = prepare_match_frame(chat_image)
     
-    # Find all locations above threshold
-    locations = np.where(result >= confidence)
-    
-    avatar_detections = []
-    
-    for pt in zip(*locations[::-1]):  # Switch x and y
-        match_confidence = result[pt[1], pt[0]]
+    # Perform template matching, on the GPU when OpenCL is available;
+    # the CPU path searches coarse-to-fine through an image pyramid
+    if OPENCL_AVAILABLE:
+        result = cv2.matchTemplate(frame, _template_umat(template_path), cv2.TM_CCOEFF_NORMED)
+        result = result.get()  # download the score map for thresholding
         
-        avatar_detection = {
-            'template_name': os.path.basename(template_path),
-            'x': pt[0],
-            'y': pt[1],
-            'width': template_width,
-            'height': template_height,
-            'confidence': float(match_confidence),
-            'center_x': pt[0] + template_width // 2,
-            'center_y': pt[1] + template_height // 2
-        }
+        # Find the best match confidence regardless of threshold
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+        best_confidence = max_val
         
-        avatar_detections.append(avatar_detection)
+        # Gather coordinates and their scores with array indexing
+        # rather than a per-pixel Python loop
+        ys, xs = np.where(result >= confidence)
+        confs = result[ys, xs]
+    else:
+        xs, ys, confs, best_confidence = _match_template_pyramid(
+            frame, template, template_path, confidence, frame_half)
     
-    # Always show the best confidence found, even if no matches above threshold
     template_name = os.path.basename(template_path)
+    
+    # Fill one structured array with all matches in vectorized column
+    # writes - rows index by field name just like the old dicts did
+    avatar_detections = np.empty(len(xs), dtype=_DET_DTYPE)
+    avatar_detections['template_name'] = template_name
+    avatar_detections['x'] = xs
+    avatar_detections['y'] = ys
+    avatar_detections['width'] = template_width
+    avatar_detections['height'] = template_height
+    avatar_detections['confidence'] = confs
+    avatar_detections['center_x'] = avatar_detections['x'] + template_width // 2
+    avatar_detections['center_y'] = avatar_detections['y'] + template_height // 2
+    
+    # Always show the best confidence found, even if no matches above threshold
     if len(avatar_detections) > 0:
         print(f"✅ Found {len(avatar_detections)} instances of {template_name} (best: {best_confidence:.3f})")
     else:
@@ -115,13 +357,33 @@ def find_avatar_by_template(chat_image: np.ndarray, template_path: str,
     
     return avatar_detections
 
-def analyze_text_area_right_of_avatar(chat_image: np.ndarray, avatar: Dict) -> Dict:
+def _precompute_text_metrics(chat_gray: np.ndarray) -> Dict:
+    """Whole-frame edge and intensity integrals for text-area analysis
+    
+    Canny and the integral images run once per captured frame; each
+    avatar's text rectangle is then scored with four table lookups
+    instead of re-running cvtColor/Canny on its (overlapping) crop.
+    """
+    edges = cv2.Canny(chat_gray, 50, 150)
+    edge_integral = cv2.integral((edges > 0).astype(np.uint8))
+    sum_integral, sqsum_integral = cv2.integral2(chat_gray)
+    return {'edge': edge_integral, 'sum': sum_integral, 'sqsum': sqsum_integral}
+
+def _rect_sum(integral: np.ndarray, x: int, y: int, w: int, h: int):
+    """Sum over a rectangle via four integral-image lookups"""
+    return (integral[y + h, x + w] - integral[y, x + w]
+            - integral[y + h, x] + integral[y, x])
+
+def analyze_text_area_right_of_avatar(chat_image: np.ndarray, avatar: Dict,
+                                      metrics: Optional[Dict] = None) -> Dict:
     """
     Analyze the text area to the right of a detected avatar using specified dimensions
     
     Args:
         chat_image: Screenshot of chat area
         avatar: Avatar detection dictionary
+        metrics: Optional output of _precompute_text_metrics, so callers
+                 analyzing many avatars share one whole-frame pass
         
     Returns:
         Analysis results including text area bounds and characteristics
@@ -144,18 +406,19 @@ def analyze_text_area_right_of_avatar(chat_image: np.ndarray, avatar: Dict) -> D
     if text_y + text_height > chat_height:
         text_height = chat_height - text_y
     
-    # Extract text area
-    text_area = chat_image[text_y:text_y + text_height, text_x:text_x + text_width]
+    if metrics is None:
+        metrics = _precompute_text_metrics(cv2.cvtColor(chat_image, cv2.COLOR_BGR2GRAY))
     
-    # Analyze text area characteristics
-    gray_text = cv2.cvtColor(text_area, cv2.COLOR_BGR2GRAY)
+    area = text_width * text_height
     
-    # Calculate text density (rough estimate)
-    edges = cv2.Canny(gray_text, 50, 150)
-    text_density = np.sum(edges > 0) / (text_width * text_height)
+    # Calculate text density (rough estimate) from the edge integral
+    text_density = _rect_sum(metrics['edge'], text_x, text_y, text_width, text_height) / area
     
     # Calculate color variance (text areas usually have more variation)
-    color_variance = np.var(gray_text)
+    # in closed form: E[x^2] - E[x]^2 from the sum/sum-of-squares integrals
+    mean = _rect_sum(metrics['sum'], text_x, text_y, text_width, text_height) / area
+    mean_sq = _rect_sum(metrics['sqsum'], text_x, text_y, text_width, text_height) / area
+    color_variance = mean_sq - mean * mean
     
     text_analysis = {
         'text_area_bounds': {
@@ -208,13 +471,19 @@ def calculate_click_coordinates(avatar: Dict, text_analysis: Dict) -> Dict:
         'options': click_options
     }
 
-def find_avatars_with_templates(template_paths: List[str], confidence: float = 0.8) -> List[Dict]:
+def find_avatars_with_templates(template_paths: List[str], confidence: float = 0.8,
+                                chat_image: Optional[np.ndarray] = None,
+                                save_debug: bool = False) -> List[Dict]:
     """
     Main function to find avatars using multiple templates
     
     Args:
         template_paths: List of paths to avatar template images
         confidence: Matching confidence threshold
+        chat_image: Optional pre-captured chat frame - callers that already
+                    hold a capture pass it in to avoid a second screenshot
+        save_debug: Save the captured frame and detection visualization
+                    under OUTPUT_DIR (costs a copy plus PNG encodes)
         
     Returns:
         List of detected avatars with analysis
@@ -224,27 +493,48 @@ def find_avatars_with_templates(template_paths: List[str], confidence: float = 0
     
     setup_directories()
     
-    # Capture chat region
-    chat_image = capture_chat_region()
+    # Capture chat region (unless the caller supplied a frame)
+    if chat_image is None:
+        chat_image = capture_chat_region()
     chat_height, chat_width = chat_image.shape[:2]
     
-    # Save full chat screenshot
+    # Save full chat screenshot only when debug artifacts are wanted
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    full_chat_path = os.path.join(OUTPUT_DIR, f"full_chat_{timestamp}.png")
-    cv2.imwrite(full_chat_path, chat_image)
-    print(f"📸 Saved full chat screenshot: {full_chat_path}")
+    if save_debug:
+        full_chat_path = os.path.join(OUTPUT_DIR, f"full_chat_{timestamp}.png")
+        _save_debug_image(full_chat_path, chat_image)
+        print(f"📸 Saving full chat screenshot: {full_chat_path}")
     
     all_detections = []
-    
-    # Process each template
-    for template_path in template_paths:
-        print(f"\n🔍 Processing template: {template_path}")
-        
-        avatar_detections = find_avatar_by_template(chat_image, template_path, confidence)
-        
+
+    # Convert the frame to grayscale once, shared by template matching
+    # and by the text-area metrics below
+    chat_gray = cv2.cvtColor(chat_image, cv2.COLOR_BGR2GRAY)
+    chat_frame = cv2.UMat(chat_gray) if OPENCL_AVAILABLE else chat_gray
+    chat_half = None if OPENCL_AVAILABLE else cv2.pyrDown(chat_gray)
+    text_metrics = _precompute_text_metrics(chat_gray)
+
+    # Match every template against the single captured frame in parallel -
+    # cv2.matchTemplate releases the GIL, so threads scale across cores
+    # max(1, ...) keeps an empty template list valid - the executor
+    # rejects max_workers=0, and the baseline simply returned no hits
+    max_workers = max(1, min(len(template_paths), os.cpu_count() or 4))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        per_template_detections = list(pool.map(
+            lambda path: find_avatar_by_template(chat_image, path, confidence,
+                                                 frame=chat_frame,
+                                                 frame_half=chat_half),
+            template_paths
+        ))
+
+    # Aggregate detections in template order
+    for template_path, avatar_detections in zip(template_paths, per_template_detections):
+        print(f"\n🔍 Processed template: {template_path}")
+
         for avatar in avatar_detections:
             # Analyze text area to the right
-            text_analysis = analyze_text_area_right_of_avatar(chat_image, avatar)
+            text_analysis = analyze_text_area_right_of_avatar(chat_image, avatar,
+                                                               metrics=text_metrics)
             
             if text_analysis:
                 # Calculate click coordinates
@@ -263,9 +553,10 @@ def find_avatars_with_templates(template_paths: List[str], confidence: float = 0
     # Remove duplicate detections (same avatar detected by multiple templates)
     unique_detections = remove_duplicate_detections(all_detections)
     
-    # Create visualization
+    # Create visualization (debug artifacts only)
     if unique_detections:
-        visualize_avatar_detections(chat_image, unique_detections, timestamp)
+        if save_debug:
+            visualize_avatar_detections(chat_image, unique_detections, timestamp)
         print_detection_results(unique_detections)
     else:
         print("❌ No avatars detected")
@@ -275,34 +566,35 @@ def find_avatars_with_templates(template_paths: List[str], confidence: float = 0
 def remove_duplicate_detections(detections: List[Dict], min_distance: int = 50) -> List[Dict]:
     """
     Remove duplicate detections that are too close to each other
+    
+    Vectorized non-maximum suppression: the pairwise center distances are
+    computed as one broadcast matrix and suppression runs greedily in
+    descending confidence order, so no Python-level pair loop remains.
     """
     if len(detections) <= 1:
         return detections
     
-    unique_detections = []
+    centers = np.array([[d['avatar']['center_x'], d['avatar']['center_y']]
+                        for d in detections], dtype=np.float32)
+    scores = np.array([d['avatar']['confidence'] for d in detections])
     
-    for detection in detections:
-        is_duplicate = False
-        avatar = detection['avatar']
-        
-        for existing in unique_detections:
-            existing_avatar = existing['avatar']
-            
-            # Calculate distance between centers
-            distance = np.sqrt((avatar['center_x'] - existing_avatar['center_x'])**2 + 
-                             (avatar['center_y'] - existing_avatar['center_y'])**2)
-            
-            if distance < min_distance:
-                # Keep the one with higher confidence
-                if avatar['confidence'] > existing_avatar['confidence']:
-                    # Replace existing with current
-                    unique_detections.remove(existing)
-                    unique_detections.append(detection)
-                is_duplicate = True
-                break
-        
-        if not is_duplicate:
-            unique_detections.append(detection)
+    # Squared pairwise center distances via broadcasting (no sqrt needed)
+    deltas = centers[:, None, :] - centers[None, :, :]
+    dist_sq = (deltas * deltas).sum(axis=2)
+    too_close = dist_sq < min_distance ** 2
+    
+    # Greedy NMS: highest-confidence detection wins, suppressing neighbours
+    order = np.argsort(scores)[::-1]
+    suppressed = np.zeros(len(detections), dtype=bool)
+    keep = []
+    for idx in order:
+        if suppressed[idx]:
+            continue
+        keep.append(idx)
+        suppressed |= too_close[idx]
+    
+    keep.sort()  # preserve original detection order
+    unique_detections = [detections[idx] for idx in keep]
     
     print(f"📊 Removed duplicates: {len(detections)} → {len(unique_detections)} unique detections")
     return unique_detections
@@ -313,50 +605,57 @@ def visualize_avatar_detections(chat_image: np.ndarray, detections: List[Dict],
     """
     debug_image = chat_image.copy()
     
-    for i, detection in enumerate(detections):
+    def rect_corners(x, y, w, h):
+        return [[x, y], [x + w, y], [x + w, y + h], [x, y + h]]
+    
+    avatar_boxes = []
+    text_boxes = []
+    message_boxes = []
+    for detection in detections:
         avatar = detection['avatar']
         text_analysis = detection['text_analysis']
-        click_coords = detection['click_coordinates']['recommended']
-        
-        # Draw avatar bounding box in red
-        cv2.rectangle(debug_image,
-                     (avatar['x'], avatar['y']),
-                     (avatar['x'] + avatar['width'], avatar['y'] + avatar['height']),
-                     (0, 0, 255), 2)  # Red
-        
-        # Draw text area in green
+        avatar_boxes.append(rect_corners(avatar['x'], avatar['y'],
+                                         avatar['width'], avatar['height']))
         text_bounds = text_analysis['text_area_bounds']
-        cv2.rectangle(debug_image,
-                     (text_bounds['x'], text_bounds['y']),
-                     (text_bounds['x'] + text_bounds['width'], text_bounds['y'] + text_bounds['height']),
-                     (0, 255, 0), 1)  # Green
-        
-        # Draw message block in blue
+        text_boxes.append(rect_corners(text_bounds['x'], text_bounds['y'],
+                                       text_bounds['width'], text_bounds['height']))
         msg_bounds = text_analysis['message_block_bounds']
-        cv2.rectangle(debug_image,
-                     (msg_bounds['x'], msg_bounds['y']),
-                     (msg_bounds['x'] + msg_bounds['width'], msg_bounds['y'] + msg_bounds['height']),
-                     (255, 0, 0), 1)  # Blue
+        message_boxes.append(rect_corners(msg_bounds['x'], msg_bounds['y'],
+                                          msg_bounds['width'], msg_bounds['height']))
+    
+    # One polylines call per color group draws every box of that kind,
+    # instead of three cv2.rectangle calls per detection
+    cv2.polylines(debug_image, np.array(avatar_boxes, dtype=np.int32),
+                  isClosed=True, color=(0, 0, 255), thickness=2)  # Red
+    cv2.polylines(debug_image, np.array(text_boxes, dtype=np.int32),
+                  isClosed=True, color=(0, 255, 0), thickness=1)  # Green
+    cv2.polylines(debug_image, np.array(message_boxes, dtype=np.int32),
+                  isClosed=True, color=(255, 0, 0), thickness=1)  # Blue
+    
+    # Click points and labels have no batch API - drawn after the boxes
+    for i, detection in enumerate(detections):
+        avatar = detection['avatar']
+        click_coords = detection['click_coordinates']['recommended']
         
         # Draw click point
-        cv2.circle(debug_image, (click_coords['x'], click_coords['y']), 5, (0, 0, 255), -1)
+        cv2.circle(debug_image, (int(click_coords['x']), int(click_coords['y'])), 5, (0, 0, 255), -1)
         
         # Label
         cv2.putText(debug_image, f"Avatar {i+1}", 
-                   (avatar['x'], avatar['y'] - 5), 
+                   (int(avatar['x']), int(avatar['y']) - 5), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
         
         # Show confidence
         cv2.putText(debug_image, f"{avatar['confidence']:.2f}", 
-                   (avatar['x'], avatar['y'] + avatar['height'] + 15), 
+                   (int(avatar['x']), int(avatar['y'] + avatar['height']) + 15), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 0, 255), 1)
     
-    # Save visualization
+    # Save visualization off the critical path
     filename = f"avatar_detections_{timestamp}.png"
     filepath = os.path.join(OUTPUT_DIR, filename)
-    cv2.imwrite(filepath, debug_image)
+    _save_debug_image(filepath, debug_image)
     
-    print(f"💾 Saved detection visualization: {filepath}")
+    print(f"💾 Saving detection visualization: {filepath}")
 
 def print_detection_results(detections: List[Dict]):
     """
@@ -378,17 +677,37 @@ def print_detection_results(detections: List[Dict]):
         print(f"   Text likely: {text_analysis['has_text_likely']}")
         print(f"   Text density: {text_analysis['text_density']:.4f}")
 
+# Recognized template image extensions (set membership beats repeated
+# endswith calls against a tuple)
+_TEMPLATE_EXTENSIONS = {'.png', '.jpg', '.jpeg'}
+
+# Last directory listing, keyed by the directory's mtime so the rescan
+# is skipped whenever no template was added, removed or renamed
+_TEMPLATE_LISTING_CACHE = (None, [])
+
 def list_available_templates() -> List[str]:
     """List all available avatar template files"""
-    if not os.path.exists(AVATAR_TEMPLATES_DIR):
+    global _TEMPLATE_LISTING_CACHE
+    try:
+        dir_mtime_ns = os.stat(AVATAR_TEMPLATES_DIR).st_mtime_ns
+    except OSError:
         return []
     
-    template_files = []
-    for file in os.listdir(AVATAR_TEMPLATES_DIR):
-        if file.lower().endswith(('.png', '.jpg', '.jpeg')):
-            template_files.append(os.path.join(AVATAR_TEMPLATES_DIR, file))
-    
-    return template_files
+    cached_mtime_ns, cached_files = _TEMPLATE_LISTING_CACHE
+    if cached_mtime_ns == dir_mtime_ns:
+        return list(cached_files)
+    
+    # scandir yields DirEntry objects whose is_file answer comes from the
+    # readdir data itself - no extra stat per file like listdir + exists
+    with os.scandir(AVATAR_TEMPLATES_DIR) as entries:
+        template_files = [
+            entry.path for entry in entries
+            if entry.is_file(follow_symlinks=False)
+            and os.path.splitext(entry.name)[1].lower() in _TEMPLATE_EXTENSIONS
+        ]
+    
+    _TEMPLATE_LISTING_CACHE = (dir_mtime_ns, template_files)
+    return list(template_files)
 
 def main():
     parser = argparse.ArgumentParser(description="Find avatars using template matching")
@@ -399,6 +718,8 @@ def main():
                        help="List available template files")
     parser.add_argument("--all-templates", action="store_true",
                        help="Use all templates in the templates directory")
+    parser.add_argument("--save-debug", action="store_true",
+                       help="Save the captured frame and detection visualization")
     
     args = parser.parse_args()
     
@@ -431,7 +752,8 @@ def main():
         return
     
     # Run detection
-    detections = find_avatars_with_templates(template_paths, args.confidence)
+    detections = find_avatars_with_templates(template_paths, args.confidence,
+                                             save_debug=args.save_debug)
     
     if detections:
         print(f"\n✅ Successfully detected {len(detections)} avatars!")
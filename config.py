@@ -2,10 +2,16 @@
 """
 Shared Configuration for Game Automation
 Contains all emulator coordinates and automation settings
+
+Set GAME_AUTOMATION_MODE=direct to use hardcoded screen coordinates
+instead of template matching (bypasses screen-recording permission);
+the default 'templates' mode matches the PNG templates on screen.
 """
 
-# Named coordinates for easy reference
-COORDINATES = {
+import os
+
+# Template-matching coordinates (default mode)
+COORDINATES_TEMPLATE = {
     'play_button': 'game_elements/play_button.png',      # Main play button (PNG template)
     'start_game': 'game_elements/start_game.png',       # Game start button (PNG template)
     'login_button': 'game_elements/login_button.png',     # Login button (PNG template)
@@ -16,26 +22,48 @@ COORDINATES = {
     'join_team': 'game_elements/join_team.png',  # Join team button (PNG template)
 }
 
+# Direct-coordinate fallback for cron jobs without screen recording access
+COORDINATES_DIRECT = {
+    # Replace these with actual coordinates from your setup
+    # You can find these by manually hovering over buttons and noting coordinates
+    'play_button': (960, 540),      # REPLACE: MuMu emulator play button coordinates
+    'start_game': (960, 600),       # REPLACE: Game start button coordinates
+    'login_button': (960, 500),     # REPLACE: Login button coordinates
+    'shi_men_task': (800, 400),     # REPLACE: Shi men task button coordinates
+    'any_place': (1286, 211),       # Keep existing coordinate
+    'shi_men_task_go_finish': (900, 450),  # REPLACE: Go finish button coordinates
+    'dialogue_button': (750, 350),   # REPLACE: Dialogue button coordinates
+    'join_team': (850, 500),        # REPLACE: Join team button coordinates
+}
+
+GAME_AUTOMATION_MODE = os.environ.get('GAME_AUTOMATION_MODE', 'templates')
+
+# Named coordinates for easy reference - selected once at import time
+COORDINATES = (
+    COORDINATES_DIRECT if GAME_AUTOMATION_MODE == 'direct' else COORDINATES_TEMPLATE
+)
+
 # Action plans for different automation sequences
 ACTION_PLANS = {
+    # Waits poll for the next click's template (wait_until) so each run
+    # spends actual boot/load time, not the hardcoded worst case; the old
+    # fixed duration lives on as the timeout upper bound (plus margin)
     '师门任务': [
         {'action': 'open_app', 'app': 'mumu', 'description': 'Open MuMu emulator'},
         {'action': 'click', 'coordinate': 'play_button', 'description': 'Click emulator play button'},
-        {'action': 'wait', 'duration': 10, 'description': 'Wait for emulator to boot'},
+        {'action': 'wait_until', 'coordinate': 'start_game', 'timeout': 12, 'min_wait': 1, 'description': 'Wait for emulator to boot'},
         {'action': 'click', 'coordinate': 'start_game', 'description': 'Click game start button'},
-        {'action': 'wait', 'duration': 36, 'description': 'Wait for game to load'},
+        {'action': 'wait_until', 'coordinate': 'login_button', 'confidence': 0.7, 'timeout': 40, 'min_wait': 1, 'description': 'Wait for game to load'},
         {'action': 'click', 'coordinate': 'login_button', 'confidence': 0.7, 'description': 'Click log in button'},
-        {'action': 'wait', 'duration': 5, 'description': 'Wait for login to complete'},
+        {'action': 'wait_until', 'coordinate': 'shi_men_task', 'timeout': 8, 'min_wait': 1, 'description': 'Wait for login to complete'},
         {'action': 'click', 'coordinate': 'shi_men_task', 'description': 'Click shi men task button'},
-        {'action': 'wait', 'duration': 3, 'description': 'Wait for game to load'},
+        {'action': 'wait_until', 'coordinate': 'shi_men_task_go_finish', 'confidence': 0.8, 'timeout': 5, 'min_wait': 1, 'description': 'Wait for game to load'},
         {'action': 'click', 'coordinate': 'shi_men_task_go_finish', 'confidence': 0.8, 'description': 'Click shi men task go finish button'},
     ],
     'activity': [
         {'action': 'click', 'coordinate': 'dialogue_button', 'confidence': 0.7, 'description': 'Click dialogue button using template matching'},
         {'action': 'avatar_keyword_click', 'keywords': '{keyword}', 'confidence': 0.8, 'description': 'Find and click avatar for {keyword} messages'},
-        {'action': 'click', 'coordinate': 'join_team', 'confidence': 0.8, 'description': 'Click join team button using template matching'},
-        {'action': 'click', 'coordinate': 'join_team', 'confidence': 0.8, 'description': 'Click join team button using template matching'},
-        {'action': 'click', 'coordinate': 'join_team', 'confidence': 0.8, 'description': 'Click join team button using template matching'}
+        {'action': 'click_until_gone', 'coordinate': 'join_team', 'confidence': 0.8, 'max_attempts': 3, 'interval': 0.3, 'description': 'Click join team button until it disappears'}
     ],
     # Legacy support - kept for backward compatibility 
     '320': [
@@ -52,7 +80,8 @@ PLAY_BUTTONS = {
 # PyAutoGUI settings
 PYAUTOGUI_SETTINGS = {
     'FAILSAFE': True,     # Move mouse to top-left corner to stop
-    'PAUSE': 0.5,         # Small pause between actions
+    'PAUSE': 0,           # No built-in pause - pacing is done explicitly
+                          # via TIMING['CLICK_PAUSE'] between clicks
 }
 
 # Application paths
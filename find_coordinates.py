@@ -5,26 +5,79 @@ Help find the exact coordinates of play buttons by hovering mouse over them
 """
 
 import pyautogui
+import math
+import threading
 import time
 import sys
 import cv2
+import functools
+import json
 import numpy as np
 import os
-from typing import Tuple, Optional, List
+from typing import Dict, Tuple, Optional, List
 
+# Optional fast capture - mss reads the framebuffer directly instead of
+# going through PIL, saving a full-frame copy per grab
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
+# Optional JIT acceleration (same pattern as _rescale)
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+# Debug screenshots are opt-in: PNG-encoding a retina frame costs tens of
+# milliseconds per write, so production runs skip the encode entirely
+DEBUG_WRITE = os.environ.get('GAME_AUTOMATION_DEBUG') == '1'
+_FAST_PNG = [cv2.IMWRITE_PNG_COMPRESSION, 1]  # fastest zlib level
+
+def _write_debug_image(path: str, image) -> None:
+    """Save a debug screenshot, only when GAME_AUTOMATION_DEBUG=1 is set"""
+    if not DEBUG_WRITE:
+        return
+    if "debug/" in path:
+        os.makedirs("debug", exist_ok=True)
+    cv2.imwrite(path, image, _FAST_PNG if path.endswith('.png') else [])
+    print(f"📸 Screenshot saved to: {path}")
+
+@functools.lru_cache(maxsize=1)
 def detect_display_scaling() -> float:
     """
     Detect display scaling factor by comparing logical vs physical screen dimensions
     
+    The factor cannot change within a run, and detecting it costs a full
+    screen grab - so the first answer is cached for the process lifetime.
+    
     Returns:
         float: Scaling factor (e.g., 2.0 for 2x scaling)
     """
     # Get logical screen size (what mouse coordinates use)
     logical_size = pyautogui.size()
-    
-    # Get physical screenshot size  
-    screenshot = pyautogui.screenshot()
-    physical_size = screenshot.size
+
+    # Ask the window server for the physical pixel dimensions directly -
+    # no pixel data has to be read just to measure the display. (Note
+    # CGDisplayPixelsWide reports points on Retina; the display mode's
+    # pixel size is the real framebuffer resolution.)
+    physical_size = None
+    try:
+        import Quartz
+        mode = Quartz.CGDisplayCopyDisplayMode(Quartz.CGMainDisplayID())
+        physical_size = (Quartz.CGDisplayModeGetPixelWidth(mode),
+                         Quartz.CGDisplayModeGetPixelHeight(mode))
+    except (ImportError, AttributeError):
+        pass
+
+    if not physical_size or not physical_size[0]:
+        # Fallback: measure the shared cached capture - the frame stays in
+        # the screenshot cache for the lookup that triggered detection
+        frame = _grab_screen()
+        physical_size = (frame.shape[1], frame.shape[0])
     
     scaling_x = physical_size[0] / logical_size[0]
     scaling_y = physical_size[1] / logical_size[1]
@@ -37,6 +90,16 @@ def detect_display_scaling() -> float:
     scaling_factor = (scaling_x + scaling_y) / 2
     return scaling_factor
 
+def refresh_display_scaling() -> float:
+    """Re-detect the scaling factor after a display change
+
+    The cached factor is valid for the process lifetime unless the
+    monitor setup changes (external display plugged in, resolution
+    switched); this drops the memoized value and measures again.
+    """
+    detect_display_scaling.cache_clear()
+    return detect_display_scaling()
+
 def logical_to_physical_coords(logical_x: int, logical_y: int, scaling_factor: float = None) -> Tuple[int, int]:
     """
     Convert logical coordinates (mouse position) to physical coordinates (screenshot)
@@ -72,9 +135,45 @@ def physical_to_logical_coords(physical_x: int, physical_y: int, scaling_factor:
     
     logical_x = int(physical_x / scaling_factor)
     logical_y = int(physical_y / scaling_factor)
-    
+
     return logical_x, logical_y
 
+def physical_to_logical_coords_batch(points, scaling_factor: float = None) -> np.ndarray:
+    """
+    Convert an (N, 2) array of physical coordinates to logical coordinates
+
+    One vectorized pass replaces one physical_to_logical_coords call per
+    candidate - on dense match result sets the per-call Python overhead
+    (function call, tuple creation) dominates the actual arithmetic.
+
+    Args:
+        points: (N, 2) array-like of physical (x, y) pairs
+        scaling_factor: Display scaling factor (auto-detected if None)
+
+    Returns:
+        np.ndarray: (N, 2) int32 array of logical (x, y) pairs
+    """
+    if scaling_factor is None:
+        scaling_factor = detect_display_scaling()
+
+    points = np.asarray(points, dtype=np.float64)
+    return (points / scaling_factor).astype(np.int32)
+
+def _live_display_loop(stop_event: threading.Event):
+    """Redraw the mouse position until stopped; runs on a helper thread
+
+    Change-deduped so a still mouse costs only the position poll, and
+    bounded at 10Hz so terminal writes stay cheap while moving.
+    """
+    last = None
+    while not stop_event.is_set():
+        position = pyautogui.position()
+        if position != last:
+            sys.stdout.write(f"\r🎯 Current position: ({position[0]:4d}, {position[1]:4d}) ")
+            sys.stdout.flush()
+            last = position
+        stop_event.wait(0.1)
+
 def find_coordinates():
     """
     Display current mouse coordinates in real-time
@@ -95,18 +194,16 @@ def find_coordinates():
         print("Move your mouse over the play button and press ENTER...")
         
         try:
-            # Show live coordinates
-            while True:
-                x, y = pyautogui.position()
-                print(f"\rCurrent position: ({x}, {y})", end="", flush=True)
-                time.sleep(0.1)
-                
-                # Check if Enter was pressed (we'll use a simple input method)
-                # For now, let's just wait for user input
-                break
-            
-            input()  # Wait for Enter
-            
+            # Show the position live on a helper thread while the main
+            # thread blocks on ENTER - the old loop printed once and broke
+            stop_event = threading.Event()
+            display = threading.Thread(target=_live_display_loop,
+                                       args=(stop_event,), daemon=True)
+            display.start()
+            input()
+            stop_event.set()
+            display.join()
+
             # Capture final coordinates
             x, y = pyautogui.position()
             coordinates[i] = (x, y)
@@ -140,16 +237,405 @@ def continuous_display():
     Continuously display mouse coordinates
     """
     print("🎯 Live Coordinate Display")
-    print("Press Ctrl+C to stop")
+    print("Press any key or Ctrl+C to stop")
     print("-" * 30)
     
     try:
+        import select
+        import termios
+        import tty
+        fd = sys.stdin.fileno()
+        old_settings = termios.tcgetattr(fd)
+    except (ImportError, OSError, ValueError):
+        # Not a POSIX tty - fall back to the plain polling loop
+        try:
+            while True:
+                x, y = pyautogui.position()
+                print(f"\rMouse position: ({x}, {y})     ", end="", flush=True)
+                time.sleep(0.1)
+        except KeyboardInterrupt:
+            pass
+        print("\n\n👋 Coordinate display stopped")
+        return
+    
+    try:
+        tty.setcbreak(fd)
+        last_position = None
         while True:
-            x, y = pyautogui.position()
-            print(f"\rMouse position: ({x}, {y})     ", end="", flush=True)
-            time.sleep(0.1)
+            # The select timeout doubles as the refresh interval; any
+            # keypress wakes it immediately and ends the display
+            if select.select([sys.stdin], [], [], 0.03)[0]:
+                sys.stdin.read(1)
+                break
+            position = pyautogui.position()
+            if position != last_position:
+                print(f"\rMouse position: ({position[0]}, {position[1]})     ", end="", flush=True)
+                last_position = position
     except KeyboardInterrupt:
-        print("\n\n👋 Coordinate display stopped")
+        pass
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+    print("\n\n👋 Coordinate display stopped")
+
+# One full-screen grab shared by every template search inside a single
+# decision tick - the TTL is short enough that the UI cannot have
+# meaningfully changed, and a Retina grab plus BGR conversion is tens
+# of megabytes of memory traffic worth skipping
+SCREEN_CACHE_TTL = 0.05  # seconds
+_SCREEN_CACHE = (0.0, None)
+
+# Persistent mss instance - reused so the display context survives
+# across grabs instead of being rebuilt each time
+_SCT = None
+
+# Reused BGR destination buffer: a Retina frame is ~50MB, so converting
+# into the same allocation avoids a large alloc+copy per grab. Callers
+# must not hold a returned frame across a later recapture.
+_FRAME_BUF = None
+
+def _grab_screen(force_refresh: bool = False) -> np.ndarray:
+    """Full-screen BGR frame, reused across calls within the cache TTL
+
+    Pass force_refresh=True in click-then-verify flows where a stale
+    frame from just before the click would defeat the verification.
+    """
+    global _SCREEN_CACHE, _SCT, _FRAME_BUF, _GRAY_CACHE, _SPECTRUM_CACHE, \
+        _UMAT_FRAME_CACHE
+    now = time.monotonic()
+    timestamp, frame = _SCREEN_CACHE
+    if not force_refresh and frame is not None and now - timestamp < SCREEN_CACHE_TTL:
+        return frame
+    if MSS_AVAILABLE:
+        if _SCT is None:
+            _SCT = mss.mss()
+        raw = _SCT.grab(_SCT.monitors[0])
+        # The raw buffer is already BGRA - dropping alpha yields BGR
+        # without the PIL round-trip or an RGB channel swap
+        source = np.asarray(raw)
+        conversion = cv2.COLOR_BGRA2BGR
+    else:
+        # asarray reads the PIL buffer without an intermediate copy
+        source = np.asarray(pyautogui.screenshot())
+        conversion = cv2.COLOR_RGB2BGR
+    if _FRAME_BUF is None or _FRAME_BUF.shape[:2] != source.shape[:2]:
+        _FRAME_BUF = np.empty(source.shape[:2] + (3,), dtype=np.uint8)
+    cv2.cvtColor(source, conversion, dst=_FRAME_BUF)
+    frame = _FRAME_BUF
+    # The buffer was overwritten in place, so the identity-keyed
+    # per-frame caches must not serve results for the old contents
+    _GRAY_CACHE = (None, None)
+    _SPECTRUM_CACHE = (None, None)
+    _UMAT_FRAME_CACHE = (None, None)
+    _SCREEN_CACHE = (now, frame)
+    return frame
+
+_GRAY_CACHE = (None, None)  # (source frame, grayscale copy)
+
+# Like _FRAME_BUF: one persistent single-channel destination so the
+# per-capture grayscale conversion allocates nothing in steady state
+_GRAY_BUF = None
+
+def _screen_gray(frame: np.ndarray) -> np.ndarray:
+    """Grayscale of a captured frame, converted once per frame object
+
+    Every matcher wants the same single-channel view of the shared
+    cached frame; keying on object identity means cvtColor runs once
+    per capture instead of once per template searched against it.
+    """
+    global _GRAY_CACHE, _GRAY_BUF
+    source, gray = _GRAY_CACHE
+    if source is not frame:
+        if _GRAY_BUF is None or _GRAY_BUF.shape != frame.shape[:2]:
+            _GRAY_BUF = np.empty(frame.shape[:2], dtype=np.uint8)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=_GRAY_BUF)
+        _GRAY_CACHE = (frame, gray)
+    return gray
+
+# Transparent GPU acceleration: with UMat inputs matchTemplate runs
+# through OpenCV's T-API on the OpenCL device when one is available
+OPENCL_AVAILABLE = cv2.ocl.haveOpenCL()
+if OPENCL_AVAILABLE:
+    cv2.ocl.setUseOpenCL(True)
+
+_UMAT_FRAME_CACHE = (None, None)  # (source gray frame, UMat upload)
+
+def _frame_umat(gray_image: np.ndarray) -> 'cv2.UMat':
+    """The frame's UMat upload, done once per frame object
+
+    Uploading a retina frame to the device costs more than a small
+    template match, so the transfer is shared by every template
+    searched against the same capture.
+    """
+    global _UMAT_FRAME_CACHE
+    source, umat = _UMAT_FRAME_CACHE
+    if source is not gray_image:
+        umat = cv2.UMat(gray_image)
+        _UMAT_FRAME_CACHE = (gray_image, umat)
+    return umat
+
+# Above this template area the frequency-domain matcher is worthwhile -
+# below it the spatial pass is cheaper than the extra transforms
+_FFT_MIN_TEMPLATE_AREA = 18 * 18
+
+_SPECTRUM_CACHE = (None, None)  # (source gray frame, spectrum entry)
+
+def _screen_spectrum(gray_image: np.ndarray):
+    """DFT and window-sum integrals of a frame, computed once per frame
+
+    Cross-correlating k templates against one frame needs the frame's
+    forward transform exactly once; the integral images supply the
+    per-window sums used to normalize raw correlation into
+    TM_CCOEFF_NORMED scores.
+    """
+    global _SPECTRUM_CACHE
+    source, entry = _SPECTRUM_CACHE
+    if source is not gray_image:
+        height, width = gray_image.shape[:2]
+        dft_height = cv2.getOptimalDFTSize(height)
+        dft_width = cv2.getOptimalDFTSize(width)
+        padded = np.zeros((dft_height, dft_width), dtype=np.float32)
+        padded[:height, :width] = gray_image
+        dft = cv2.dft(padded, flags=cv2.DFT_COMPLEX_OUTPUT)
+        integral, sq_integral = cv2.integral2(gray_image)
+        entry = (dft, integral, sq_integral, (dft_height, dft_width))
+        _SPECTRUM_CACHE = (gray_image, entry)
+    return entry
+
+@functools.lru_cache(maxsize=64)
+def _template_spectrum(template_path: str, mtime_ns: int,
+                       dft_size: Tuple[int, int]):
+    """Zero-mean template DFT and norm for one transform size
+
+    The frame's spectrum and integrals are already cached per capture;
+    caching the template side too means repeated queries for the same
+    template pay no forward transform at all after the first frame.
+    """
+    variants = _load_template_variants_cached(template_path, mtime_ns)
+    if variants is None:
+        return None
+    _, gray_template, _ = variants
+
+    template = gray_template.astype(np.float32)
+    centered = template - float(template.mean())
+    template_norm = float(np.sqrt(np.sum(centered * centered)))
+    padded = np.zeros(dft_size, dtype=np.float32)
+    padded[:centered.shape[0], :centered.shape[1]] = centered
+    return cv2.dft(padded, flags=cv2.DFT_COMPLEX_OUTPUT), template_norm
+
+def _match_ccoeff_normed_fft(gray_image: np.ndarray,
+                             gray_template: np.ndarray,
+                             template_path: str = None) -> Optional[np.ndarray]:
+    """TM_CCOEFF_NORMED score map via frequency-domain cross-correlation
+
+    Equivalent to cv2.matchTemplate over the valid region, but the
+    frame's DFT and integrals come from the per-frame cache, so matching
+    several templates against one capture pays for one forward transform
+    of the frame instead of one per template.
+    """
+    image_dft, integral, sq_integral, dft_size = _screen_spectrum(gray_image)
+    height, width = gray_image.shape[:2]
+    template_height, template_width = gray_template.shape[:2]
+    out_height = height - template_height + 1
+    out_width = width - template_width + 1
+    if out_height <= 0 or out_width <= 0:
+        return None
+
+    # Zero-mean the template: the correlation of a centered template is
+    # exactly the TM_CCOEFF numerator, since sum(t - mean(t)) == 0.
+    # With a path the transform comes from the per-template cache.
+    cached = None
+    if template_path is not None:
+        try:
+            mtime_ns = os.stat(template_path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns is not None:
+            cached = _template_spectrum(template_path, mtime_ns, dft_size)
+    if cached is not None:
+        template_dft, template_norm = cached
+    else:
+        template = gray_template.astype(np.float32)
+        centered = template - float(template.mean())
+        template_norm = float(np.sqrt(np.sum(centered * centered)))
+        padded = np.zeros(dft_size, dtype=np.float32)
+        padded[:template_height, :template_width] = centered
+        template_dft = cv2.dft(padded, flags=cv2.DFT_COMPLEX_OUTPUT)
+    correlation = cv2.idft(
+        cv2.mulSpectrums(image_dft, template_dft, 0, conjB=True),
+        flags=cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT,
+    )[:out_height, :out_width]
+
+    if NUMBA_AVAILABLE:
+        return _normalize_correlation_jit(
+            correlation, np.asarray(integral, dtype=np.float64),
+            np.asarray(sq_integral, dtype=np.float64),
+            template_height, template_width, template_norm)
+    return _normalize_correlation_np(correlation, integral, sq_integral,
+                                     template_height, template_width,
+                                     template_norm)
+
+def _normalize_correlation_np(correlation, integral, sq_integral,
+                              template_height, template_width, template_norm):
+    """Vectorized normalization of a raw CCOEFF map into NCC scores
+
+    Per-window image variance comes from the integral images in closed
+    form (E[x^2] - E[x]^2), so the cost is a handful of array passes.
+    """
+    out_height, out_width = correlation.shape
+    window_area = template_height * template_width
+    win_sum = (integral[template_height:template_height + out_height,
+                        template_width:template_width + out_width]
+               - integral[:out_height, template_width:template_width + out_width]
+               - integral[template_height:template_height + out_height, :out_width]
+               + integral[:out_height, :out_width])
+    win_sq_sum = (sq_integral[template_height:template_height + out_height,
+                              template_width:template_width + out_width]
+                  - sq_integral[:out_height, template_width:template_width + out_width]
+                  - sq_integral[template_height:template_height + out_height, :out_width]
+                  + sq_integral[:out_height, :out_width])
+    win_var = np.maximum(win_sq_sum - win_sum * win_sum / window_area, 0)
+
+    denominator = template_norm * np.sqrt(win_var)
+    result = np.zeros_like(correlation)
+    np.divide(correlation, denominator, out=result, where=denominator > 1e-6)
+    return result
+
+def _normalize_correlation_loops(correlation, integral, sq_integral,
+                                 template_height, template_width,
+                                 template_norm):
+    """Loop form of the normalization, written for numba's parallel JIT
+
+    Fuses the window-sum, variance, sqrt and divide passes into one
+    screenshot-sized sweep with row-level parallelism; only ever called
+    through the compiled wrapper below.
+    """
+    out_height, out_width = correlation.shape
+    window_area = float(template_height * template_width)
+    result = np.zeros_like(correlation)
+    for y in prange(out_height):
+        for x in range(out_width):
+            win_sum = (integral[y + template_height, x + template_width]
+                       - integral[y, x + template_width]
+                       - integral[y + template_height, x]
+                       + integral[y, x])
+            win_sq_sum = (sq_integral[y + template_height, x + template_width]
+                          - sq_integral[y, x + template_width]
+                          - sq_integral[y + template_height, x]
+                          + sq_integral[y, x])
+            variance = win_sq_sum - win_sum * win_sum / window_area
+            if variance > 0.0:
+                denominator = template_norm * np.sqrt(variance)
+                if denominator > 1e-6:
+                    result[y, x] = correlation[y, x] / denominator
+    return result
+
+if NUMBA_AVAILABLE:
+    _normalize_correlation_jit = njit(
+        parallel=True, fastmath=True, cache=True, nogil=True
+    )(_normalize_correlation_loops)
+
+def _match_full_frame(gray_image: np.ndarray,
+                      gray_template: np.ndarray,
+                      template_path: str = None) -> Optional[np.ndarray]:
+    """Full-resolution score map, routed to the cheaper backend
+
+    With an OpenCL device the whole map is computed on the GPU through
+    the T-API (the frame upload is cached per capture). On the CPU,
+    large templates go through the frequency-domain path so the frame
+    spectrum amortizes across templates; small ones stay spatial.
+    """
+    if (gray_image.shape[0] < gray_template.shape[0]
+            or gray_image.shape[1] < gray_template.shape[1]):
+        return None
+    if OPENCL_AVAILABLE:
+        result = cv2.matchTemplate(_frame_umat(gray_image),
+                                   cv2.UMat(gray_template),
+                                   cv2.TM_CCOEFF_NORMED)
+        return result.get()
+    if gray_template.shape[0] * gray_template.shape[1] >= _FFT_MIN_TEMPLATE_AREA:
+        result = _match_ccoeff_normed_fft(gray_image, gray_template,
+                                          template_path=template_path)
+        if result is not None:
+            return result
+    return cv2.matchTemplate(gray_image, gray_template, cv2.TM_CCOEFF_NORMED)
+
+# Learned search regions: after a template is found, its neighbourhood
+# is remembered so the next search starts from a small ROI instead of
+# the whole screen, falling back to full-screen only on a miss
+ROI_CACHE_FILE = os.path.expanduser('~/.cache/gameauto/template_rois.json')
+ROI_LEARN_PAD = 150  # logical pixels kept around the last-seen center
+
+_LEARNED_ROIS = None
+
+def _learned_rois():
+    """The learned-ROI map, loaded from the sidecar file once"""
+    global _LEARNED_ROIS
+    if _LEARNED_ROIS is None:
+        try:
+            with open(ROI_CACHE_FILE) as f:
+                _LEARNED_ROIS = json.load(f)
+        except (OSError, ValueError):
+            _LEARNED_ROIS = {}
+    return _LEARNED_ROIS
+
+def _learned_roi(template_path: str) -> Optional[Tuple[int, int, int, int]]:
+    """Last learned (x, y, w, h) logical search region for a template"""
+    entry = _learned_rois().get(template_path)
+    return tuple(entry) if entry else None
+
+def _remember_roi(template_path: str, logical_x: int, logical_y: int):
+    """Record where a template was just found, padded for next time"""
+    _learned_rois()[template_path] = [
+        max(logical_x - ROI_LEARN_PAD, 0),
+        max(logical_y - ROI_LEARN_PAD, 0),
+        2 * ROI_LEARN_PAD,
+        2 * ROI_LEARN_PAD,
+    ]
+    try:
+        os.makedirs(os.path.dirname(ROI_CACHE_FILE), exist_ok=True)
+        with open(ROI_CACHE_FILE, 'w') as f:
+            json.dump(_LEARNED_ROIS, f)
+    except OSError:
+        pass  # The cache is an optimization - never fail the search
+
+# Decoded templates keyed by (path, mtime) - each entry carries the BGR
+# image plus precomputed grayscale and quarter-scale copies, so repeated
+# detections skip the PNG decode and the per-call conversions
+@functools.lru_cache(maxsize=64)
+def _load_template_variants_cached(template_path: str, mtime_ns: int):
+    """Decode one template version; mtime_ns keys out stale cache entries"""
+    template = cv2.imread(template_path, cv2.IMREAD_COLOR)
+    if template is None:
+        return None
+    gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+    small = cv2.pyrDown(cv2.pyrDown(gray))
+    return (template, gray, small)
+
+def _load_template_variants(template_path: str):
+    """Load a template once, with cached grayscale and pyramid copies
+
+    Keyed by (path, mtime) so a re-captured template picks up the new
+    pixels without restarting, while unchanged files never touch disk
+    after the first decode.
+
+    Returns:
+        Tuple of (bgr, gray, quarter_scale_gray), or None on failure
+    """
+    try:
+        mtime_ns = os.stat(template_path).st_mtime_ns
+    except OSError:
+        return None
+    return _load_template_variants_cached(template_path, mtime_ns)
+
+def preload_templates(template_paths) -> None:
+    """Decode the given template images into the cache ahead of first use
+
+    Called from the executor's background prewarm so disk I/O and PNG
+    decode overlap application startup instead of the first click.
+    """
+    for template_path in template_paths:
+        if os.path.exists(template_path):
+            _load_template_variants(template_path)
 
 def find_icon_coordinates(template_path: str, confidence: float = 0.8, screenshot_path: str = None) -> Optional[Tuple[int, int]]:
     """
@@ -170,33 +656,46 @@ def find_icon_coordinates(template_path: str, confidence: float = 0.8, screensho
             print(f"❌ Template image not found: {template_path}")
             return None
         
-        # Take screenshot
-        screenshot = pyautogui.screenshot()
-        screenshot_cv = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+        # Take screenshot (shared across searches in the same tick)
+        screenshot_cv = _grab_screen()
         
         # Save screenshot if path provided (for debugging)
         if screenshot_path:
-            # Ensure debug directory exists if saving to debug folder
-            if "debug/" in screenshot_path:
-                os.makedirs("debug", exist_ok=True)
-            cv2.imwrite(screenshot_path, screenshot_cv)
-            print(f"📸 Screenshot saved to: {screenshot_path}")
-        
-        # Load template image
-        template = cv2.imread(template_path, cv2.IMREAD_COLOR)
-        if template is None:
+            _write_debug_image(screenshot_path, screenshot_cv)
+        
+        # Load template image (cached, with a grayscale copy)
+        variants = _load_template_variants(template_path)
+        if variants is None:
             print(f"❌ Failed to load template image: {template_path}")
             return None
+        _, gray_template, _ = variants
         
-        # Get template dimensions
-        template_height, template_width = template.shape[:2]
-        
-        # Perform template matching
-        result = cv2.matchTemplate(screenshot_cv, template, cv2.TM_CCOEFF_NORMED)
-        
-        # Find the best match
-        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+        _, _, small_template = variants
         
+        # Get template dimensions
+        template_height, template_width = gray_template.shape[:2]
+
+        # Degenerate case: the template is a full-frame reference image,
+        # so there is exactly one alignment - a single absdiff pass
+        # replaces the sliding-window match entirely
+        if gray_template.shape == screenshot_cv.shape[:2]:
+            difference = cv2.absdiff(_screen_gray(screenshot_cv), gray_template)
+            score = 1.0 - float(cv2.mean(difference)[0]) / 255.0
+            if score < confidence:
+                print(f"❌ Icon not found. Best match confidence: {score:.3f} (threshold: {confidence:.3f})")
+                return None
+            center_x = template_width // 2
+            center_y = template_height // 2
+            print(f"✅ Icon found at ({center_x}, {center_y}) with confidence: {score:.3f}")
+            return (center_x, center_y)
+
+        # Coarse-to-fine matching: quarter-scale scan, full-res window
+        # refinement - same pyramid the scaled finder uses
+        max_val, max_loc = _match_template_pyramid(
+            screenshot_cv, None, confidence,
+            gray_template=gray_template, small_template=small_template,
+            gray_image=_screen_gray(screenshot_cv))
+
         # Check if confidence threshold is met
         if max_val < confidence:
             print(f"❌ Icon not found. Best match confidence: {max_val:.3f} (threshold: {confidence:.3f})")
@@ -215,6 +714,29 @@ def find_icon_coordinates(template_path: str, confidence: float = 0.8, screensho
         return None
 
 
+def _local_maxima(score_map: np.ndarray, template_height: int,
+                  template_width: int, threshold: float):
+    """Indices of per-neighbourhood peak scores above the threshold
+
+    Grey-dilating the score map with a template-sized kernel and keeping
+    only pixels that equal their own dilation collapses the plateau of
+    near-duplicate responses around each real instance to single peaks,
+    so downstream NMS sees a handful of candidates instead of hundreds.
+
+    The sweep runs on a uint8 remap of the scores ([-1, 1] scaled onto
+    [0, 255]), so the dilation and comparisons move a quarter of the
+    float32 map's bytes; callers re-read exact float scores at the
+    returned peak positions, and NMS re-applies the float threshold, so
+    the one-level quantization slack cannot admit false positives.
+    """
+    kernel = np.ones((min(template_height, 31), min(template_width, 31)),
+                     np.uint8)
+    scores_u8 = cv2.convertScaleAbs(score_map, alpha=127.5, beta=127.5)
+    threshold_u8 = int((threshold + 1.0) * 127.5)
+    dilated = cv2.dilate(scores_u8, kernel)
+    return np.nonzero((scores_u8 >= threshold_u8) & (scores_u8 >= dilated))
+
+
 def find_all_icon_coordinates(template_path: str, confidence: float = 0.8) -> List[Tuple[int, int]]:
     """
     Find all instances of an icon on the screen
@@ -231,30 +753,75 @@ def find_all_icon_coordinates(template_path: str, confidence: float = 0.8) -> Li
             print(f"❌ Template image not found: {template_path}")
             return []
         
-        # Take screenshot
-        screenshot = pyautogui.screenshot()
-        screenshot_cv = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+        # Take screenshot (shared across searches in the same tick)
+        screenshot_cv = _grab_screen()
         
-        # Load template
-        template = cv2.imread(template_path, cv2.IMREAD_COLOR)
-        if template is None:
+        # Load template (cached, with a grayscale copy)
+        variants = _load_template_variants(template_path)
+        if variants is None:
             print(f"❌ Failed to load template image: {template_path}")
             return []
+        _, gray_template, small_template = variants
         
-        template_height, template_width = template.shape[:2]
+        template_height, template_width = gray_template.shape[:2]
+
+        gray_screenshot = _screen_gray(screenshot_cv)
         
-        # Perform template matching
-        result = cv2.matchTemplate(screenshot_cv, template, cv2.TM_CCOEFF_NORMED)
+        # Coarse pass at quarter scale with a slightly relaxed threshold,
+        # then re-match each candidate at full resolution in a small
+        # window - ~16x fewer multiply-accumulates than a full-res scan
+        boxes = []
+        scores = []
+        if (min(small_template.shape[:2]) < PYRAMID_MIN_TEMPLATE_SIZE
+                or gray_screenshot.shape[0] // 4 < small_template.shape[0]
+                or gray_screenshot.shape[1] // 4 < small_template.shape[1]):
+            result = cv2.matchTemplate(gray_screenshot, gray_template, cv2.TM_CCOEFF_NORMED)
+            # Global max first: when no instance is present (the common
+            # case) minMaxLoc is far cheaper than the peak extraction
+            _, max_val, _, _ = cv2.minMaxLoc(result)
+            if max_val < confidence:
+                print("✅ Found 0 instances of the icon")
+                return []
+            ys, xs = _local_maxima(result, template_height, template_width,
+                                   confidence)
+            boxes = [[int(x), int(y), template_width, template_height]
+                     for x, y in zip(xs, ys)]
+            scores = result[ys, xs].tolist()
+        else:
+            small_image = cv2.pyrDown(cv2.pyrDown(gray_screenshot))
+            coarse = cv2.matchTemplate(small_image, small_template, cv2.TM_CCOEFF_NORMED)
+            _, coarse_max, _, _ = cv2.minMaxLoc(coarse)
+            if coarse_max < confidence - 0.05:
+                print("✅ Found 0 instances of the icon")
+                return []
+            coarse_ys, coarse_xs = np.where(coarse >= confidence - 0.05)
+            for cx, cy in zip(coarse_xs, coarse_ys):
+                window_x = max(0, int(cx) * 4 - PYRAMID_REFINE_WINDOW)
+                window_y = max(0, int(cy) * 4 - PYRAMID_REFINE_WINDOW)
+                window = gray_screenshot[
+                    window_y:window_y + template_height + 2 * PYRAMID_REFINE_WINDOW,
+                    window_x:window_x + template_width + 2 * PYRAMID_REFINE_WINDOW
+                ]
+                if (window.shape[0] < template_height
+                        or window.shape[1] < template_width):
+                    continue
+                local = cv2.matchTemplate(window, gray_template, cv2.TM_CCOEFF_NORMED)
+                ys, xs = _local_maxima(local, template_height, template_width,
+                                       confidence)
+                for x, y in zip(xs, ys):
+                    boxes.append([window_x + int(x), window_y + int(y),
+                                  template_width, template_height])
+                    scores.append(float(local[y, x]))
         
-        # Find all locations above threshold
-        locations = np.where(result >= confidence)
+        # Collapse the cloud of near-duplicate peaks around each real
+        # icon with one non-maximum suppression call
         found_coords = []
-        
-        # Convert to center coordinates
-        for pt in zip(*locations[::-1]):  # Switch x and y
-            center_x = pt[0] + template_width // 2
-            center_y = pt[1] + template_height // 2
-            found_coords.append((center_x, center_y))
+        if boxes:
+            keep = cv2.dnn.NMSBoxes(boxes, scores, confidence, 0.3)
+            kept = np.asarray(boxes, dtype=np.int32)[np.asarray(keep).flatten()]
+            # Center extraction in one vectorized pass over the kept boxes
+            centers = kept[:, :2] + kept[:, 2:] // 2
+            found_coords = sorted(map(tuple, centers.tolist()))
         
         print(f"✅ Found {len(found_coords)} instances of the icon")
         for i, (x, y) in enumerate(found_coords, 1):
@@ -267,6 +834,51 @@ def find_all_icon_coordinates(template_path: str, confidence: float = 0.8) -> Li
         return []
 
 
+def find_icons_batch(template_paths: List[str],
+                     confidence: float = 0.8) -> Dict[str, Optional[Tuple[int, int]]]:
+    """
+    Locate several icons on a single captured frame
+
+    The screenshot, its grayscale conversion and its forward DFT are all
+    shared across the templates, so hunting k icons costs one capture
+    and one frame transform plus k per-template passes - instead of k
+    full captures and k transforms.
+
+    Args:
+        template_paths: Template image paths to search for
+        confidence: Minimum confidence threshold applied to each template
+
+    Returns:
+        Dict mapping each template path to the center (x, y) of its best
+        match in physical pixels, or None when not found
+    """
+    gray_screenshot = _screen_gray(_grab_screen())
+
+    results = {}
+    for template_path in template_paths:
+        variants = _load_template_variants(template_path)
+        if variants is None:
+            print(f"❌ Failed to load template image: {template_path}")
+            results[template_path] = None
+            continue
+        _, gray_template, _ = variants
+
+        result = _match_full_frame(gray_screenshot, gray_template,
+                                   template_path=template_path)
+        if result is None:
+            results[template_path] = None
+            continue
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val < confidence:
+            results[template_path] = None
+            continue
+
+        template_height, template_width = gray_template.shape[:2]
+        results[template_path] = (max_loc[0] + template_width // 2,
+                                  max_loc[1] + template_height // 2)
+    return results
+
+
 def click_icon_by_template(template_path: str, confidence: float = 0.8, click_delay: float = 0.5) -> bool:
     """
     Find and click an icon using template matching
@@ -291,6 +903,43 @@ def click_icon_by_template(template_path: str, confidence: float = 0.8, click_de
     return False
 
 
+def probe_icon_confidence(template_path: str) -> Optional[float]:
+    """Report how a template scores across the standard thresholds
+
+    Runs matchTemplate exactly once and derives every threshold's
+    answer from the same score map, instead of re-matching the screen
+    per confidence level.
+
+    Returns:
+        float: The best confidence found, or None on failure
+    """
+    variants = _load_template_variants(template_path)
+    if variants is None:
+        print(f"❌ Failed to load template image: {template_path}")
+        return None
+    _, gray_template, _ = variants
+    template_height, template_width = gray_template.shape[:2]
+
+    gray_screenshot = _screen_gray(_grab_screen())
+    result = _match_full_frame(gray_screenshot, gray_template,
+                               template_path=template_path)
+    if result is None:
+        print("❌ Template larger than the screen")
+        return None
+
+    _, best, _, best_loc = cv2.minMaxLoc(result)
+    center_x = best_loc[0] + template_width // 2
+    center_y = best_loc[1] + template_height // 2
+    print(f"🏆 Best match: {best:.3f} at physical ({center_x}, {center_y})")
+
+    print("📊 Matches per confidence level (one matchTemplate pass):")
+    for level in (0.9, 0.8, 0.7, 0.6, 0.5, 0.4, 0.3):
+        count = int(np.count_nonzero(result >= level))
+        marker = "✅" if count else "❌"
+        print(f"   {marker} >= {level:.1f}: {count} location(s)")
+
+    return best
+
 def interactive_icon_finder():
     """
     Interactive tool to find icons using template matching
@@ -305,17 +954,18 @@ def interactive_icon_finder():
         print("1. Find single icon")
         print("2. Find all instances of an icon")
         print("3. Find and click icon")
-        print("4. Exit")
+        print("4. Probe confidence levels")
+        print("5. Exit")
         
         try:
-            choice = input("\nEnter your choice (1-4): ").strip()
+            choice = input("\nEnter your choice (1-5): ").strip()
             
-            if choice == "4":
+            if choice == "5":
                 print("👋 Goodbye!")
                 break
             
-            if choice not in ["1", "2", "3"]:
-                print("❌ Invalid choice. Please enter 1-4.")
+            if choice not in ["1", "2", "3", "4"]:
+                print("❌ Invalid choice. Please enter 1-5.")
                 continue
             
             # Get template path
@@ -324,6 +974,11 @@ def interactive_icon_finder():
                 print("❌ Template path cannot be empty")
                 continue
             
+            # The confidence probe sweeps all levels itself
+            if choice == "4":
+                probe_icon_confidence(template_path)
+                continue
+            
             # Get confidence threshold
             try:
                 confidence_input = input("Enter confidence threshold (0.0-1.0, default 0.8): ").strip()
@@ -359,17 +1014,106 @@ def interactive_icon_finder():
         except Exception as e:
             print(f"❌ Error: {e}")
 
-def find_icon_coordinates_scaled(template_path: str, logical_x: int = None, logical_y: int = None, 
-                               confidence: float = 0.8, screenshot_path: str = None) -> Optional[Tuple[int, int]]:
+# Minimum coarse template side before the pyramid pass stops being reliable
+PYRAMID_MIN_TEMPLATE_SIZE = 8
+
+# Padding (in full-resolution pixels) around the coarse hit when refining
+PYRAMID_REFINE_WINDOW = 16
+
+def _match_template_pyramid(search_image: np.ndarray, template: np.ndarray,
+                            confidence: float,
+                            gray_template: np.ndarray = None,
+                            small_template: np.ndarray = None,
+                            gray_image: np.ndarray = None) -> Tuple[float, Tuple[int, int]]:
+    """
+    Coarse-to-fine template matching: locate at 1/4 scale, refine at full scale
+
+    Both images are matched in grayscale first - matchTemplate is
+    O(W*H*w*h), so quartering every dimension makes the coarse pass ~256x
+    cheaper, and the refinement only re-matches a small window.
+
+    Args:
+        search_image: BGR screenshot region to search
+        template: BGR template image
+        confidence: Minimum confidence threshold
+
+    Returns:
+        Tuple[float, Tuple[int, int]]: (best confidence, top-left location)
+    """
+    if gray_image is None:
+        gray_image = cv2.cvtColor(search_image, cv2.COLOR_BGR2GRAY)
+    if gray_template is None:
+        gray_template = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+
+    # Downsample both by 4 (two pyramid levels); the template's pyramid
+    # comes precomputed from the cache when available
+    small_image = cv2.pyrDown(cv2.pyrDown(gray_image))
+    if small_template is None:
+        small_template = cv2.pyrDown(cv2.pyrDown(gray_template))
+    scale = 4
+
+    # Large templates survive a third halving - each extra level cuts the
+    # coarse pass by another ~16x in multiply-accumulates
+    if (min(small_template.shape[:2]) // 2 >= PYRAMID_MIN_TEMPLATE_SIZE
+            and small_image.shape[0] // 2 >= small_template.shape[0]
+            and small_image.shape[1] // 2 >= small_template.shape[1]):
+        small_image = cv2.pyrDown(small_image)
+        small_template = cv2.pyrDown(small_template)
+        scale = 8
+
+    # Fall back to a plain full-resolution match when the template gets too
+    # small to match reliably at coarse scale
+    if (min(small_template.shape[:2]) < PYRAMID_MIN_TEMPLATE_SIZE
+            or small_image.shape[0] < small_template.shape[0]
+            or small_image.shape[1] < small_template.shape[1]):
+        result = cv2.matchTemplate(gray_image, gray_template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        return max_val, max_loc
+
+    # Coarse pass at 1/4 scale with the cheaper squared-difference
+    # metric - no per-window mean subtraction, and the score is only
+    # used here to locate the peak and gate hopeless frames. The
+    # refinement below re-scores with TM_CCOEFF_NORMED at full
+    # resolution, so reported confidences keep their meaning.
+    coarse = cv2.matchTemplate(small_image, small_template, cv2.TM_SQDIFF_NORMED)
+    coarse_min, _, coarse_loc, _ = cv2.minMaxLoc(coarse)
+    coarse_val = 1.0 - coarse_min  # similarity-style score, approximate
+
+    # Loose gate: only bail early when the coarse pass is hopeless
+    if coarse_val < confidence * 0.5:
+        return coarse_val, (coarse_loc[0] * scale, coarse_loc[1] * scale)
+
+    # Refine in a small full-resolution window around the coarse hit;
+    # the window pad grows with the scale so one coarse pixel of
+    # localization error still lands inside it
+    refine_pad = PYRAMID_REFINE_WINDOW * scale // 4
+    template_height, template_width = gray_template.shape[:2]
+    window_x = max(0, coarse_loc[0] * scale - refine_pad)
+    window_y = max(0, coarse_loc[1] * scale - refine_pad)
+    window = gray_image[
+        window_y:window_y + template_height + 2 * refine_pad,
+        window_x:window_x + template_width + 2 * refine_pad
+    ]
+
+    result = cv2.matchTemplate(window, gray_template, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    return max_val, (max_loc[0] + window_x, max_loc[1] + window_y)
+
+def find_icon_coordinates_scaled(template_path: str, logical_x: int = None, logical_y: int = None,
+                               confidence: float = 0.8, screenshot_path: str = None,
+                               roi: Tuple[int, int, int, int] = None) -> Optional[Tuple[int, int]]:
     """
     Find icon coordinates with automatic display scaling handling
-    
+
     Args:
         template_path: Path to template image
         logical_x, logical_y: Expected logical coordinates (optional, for validation)
         confidence: Matching confidence threshold
         screenshot_path: Debug screenshot path
-        
+        roi: Optional (x, y, width, height) search region in logical
+             coordinates - restricting the search cuts matchTemplate cost
+             proportionally to the region size
+
     Returns:
         Tuple[int, int]: Logical coordinates (for mouse clicking)
     """
@@ -382,38 +1126,77 @@ def find_icon_coordinates_scaled(template_path: str, logical_x: int = None, logi
             print(f"❌ Template image not found: {template_path}")
             return None
         
-        # Take screenshot and convert to OpenCV format
-        screenshot = pyautogui.screenshot()
-        screenshot_cv = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+        # Take screenshot (shared across searches in the same tick)
+        screenshot_cv = _grab_screen()
         
         # Save debug screenshot if requested
         if screenshot_path:
-            if "debug/" in screenshot_path:
-                os.makedirs("debug", exist_ok=True)
-            cv2.imwrite(screenshot_path, screenshot_cv)
-            print(f"📸 Screenshot saved to: {screenshot_path}")
-        
-        # Load template
-        template = cv2.imread(template_path, cv2.IMREAD_COLOR)
-        if template is None:
+            _write_debug_image(screenshot_path, screenshot_cv)
+        
+        # Load template (cached, with grayscale and pyramid copies)
+        variants = _load_template_variants(template_path)
+        if variants is None:
             print(f"❌ Failed to load template: {template_path}")
             return None
+        template, gray_template, small_template = variants
         
         # Get template dimensions
         template_height, template_width = template.shape[:2]
-        
-        # Perform template matching
-        result = cv2.matchTemplate(screenshot_cv, template, cv2.TM_CCOEFF_NORMED)
-        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-        
+
+        # Restrict the search region: an explicit ROI wins, then the
+        # caller's expected position, then a region learned from the
+        # template's last sighting - each with a full-screen retry below
+        learned = None
+        if roi is None and logical_x is not None and logical_y is not None:
+            roi = (max(logical_x - ROI_LEARN_PAD, 0),
+                   max(logical_y - ROI_LEARN_PAD, 0),
+                   2 * ROI_LEARN_PAD, 2 * ROI_LEARN_PAD)
+            learned = roi  # shares the stale-region retry path
+        elif roi is None:
+            learned = _learned_roi(template_path)
+            roi = learned
+
+        gray_screen = _screen_gray(screenshot_cv)
+        search_image = screenshot_cv
+        gray_search = gray_screen
+        roi_offset_x, roi_offset_y = 0, 0
+        if roi is not None:
+            roi_x, roi_y, roi_width, roi_height = roi
+            roi_offset_x = int(roi_x * scaling_factor)
+            roi_offset_y = int(roi_y * scaling_factor)
+            roi_slice = (
+                slice(roi_offset_y, roi_offset_y + int(roi_height * scaling_factor)),
+                slice(roi_offset_x, roi_offset_x + int(roi_width * scaling_factor)),
+            )
+            search_image = screenshot_cv[roi_slice]
+            gray_search = gray_screen[roi_slice]
+            print(f"🔎 Searching ROI: logical ({roi_x}, {roi_y}) size {roi_width}x{roi_height}")
+
+        # Perform coarse-to-fine template matching with the cached copies
+        max_val, max_loc = _match_template_pyramid(
+            search_image, template, confidence,
+            gray_template=gray_template, small_template=small_template,
+            gray_image=gray_search)
+
+        # A learned region can go stale (UI moved) - retry the whole
+        # screen before declaring a miss
+        if max_val < confidence and learned is not None:
+            print("🔁 Learned ROI missed - retrying full screen")
+            search_image = screenshot_cv
+            roi_offset_x, roi_offset_y = 0, 0
+            max_val, max_loc = _match_template_pyramid(
+                search_image, template, confidence,
+                gray_template=gray_template, small_template=small_template,
+                gray_image=gray_screen)
+
         # Check confidence threshold
         if max_val < confidence:
             print(f"❌ Icon not found. Best confidence: {max_val:.3f} (threshold: {confidence:.3f})")
             return None
-        
-        # Calculate physical center coordinates
-        physical_center_x = max_loc[0] + template_width // 2
-        physical_center_y = max_loc[1] + template_height // 2
+
+        # Calculate physical center coordinates (offset back to full screen)
+        physical_center_x = max_loc[0] + roi_offset_x + template_width // 2
+        physical_center_y = max_loc[1] + roi_offset_y + template_height // 2
         
         # Convert to logical coordinates for mouse clicking
         logical_center_x, logical_center_y = physical_to_logical_coords(
@@ -424,10 +1207,15 @@ def find_icon_coordinates_scaled(template_path: str, logical_x: int = None, logi
         print(f"   Physical coords (screenshot): ({physical_center_x}, {physical_center_y})")
         print(f"   Logical coords (mouse): ({logical_center_x}, {logical_center_y})")
         print(f"   Confidence: {max_val:.3f}")
+
+        # Remember the neighbourhood for the next search
+        _remember_roi(template_path, logical_center_x, logical_center_y)
         
         # If expected logical coordinates provided, show comparison
         if logical_x is not None and logical_y is not None:
-            distance = np.sqrt((logical_center_x - logical_x)**2 + (logical_center_y - logical_y)**2)
+            # math.hypot on two scalars - no numpy array round-trip
+            distance = math.hypot(logical_center_x - logical_x,
+                                  logical_center_y - logical_y)
             print(f"   Distance from expected ({logical_x}, {logical_y}): {distance:.1f} pixels")
         
         return logical_center_x, logical_center_y
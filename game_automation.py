@@ -12,7 +12,7 @@ import os
 from pathlib import Path
 
 # Import shared configuration
-from config import PLAY_BUTTONS, PYAUTOGUI_SETTINGS, MUMU_PATHS, TIMING
+from config import COORDINATES, PLAY_BUTTONS, PYAUTOGUI_SETTINGS, MUMU_PATHS, TIMING
 
 # Import automation libraries
 try:
@@ -21,6 +21,13 @@ try:
 except ImportError:
     AUTOMATION_AVAILABLE = False
 
+# Template matching for readiness polling (optional)
+try:
+    from find_coordinates import find_icon_coordinates_scaled
+    ICON_DETECTION_AVAILABLE = True
+except ImportError:
+    ICON_DETECTION_AVAILABLE = False
+
 class GameAutomation:
     def __init__(self, verbose=False):
         self.mumu_path = self.find_mumu_path()
@@ -44,6 +51,24 @@ class GameAutomation:
         
         return None
     
+    def wait_for_icon(self, template_path, timeout, poll=0.25):
+        """Poll for a template until it appears, capped by a timeout
+
+        Replaces blind startup sleeps: the wait ends the moment the icon
+        shows up, so the worst case equals the old fixed sleep while the
+        typical case is much shorter. Returns True if the icon appeared.
+        """
+        if not ICON_DETECTION_AVAILABLE:
+            time.sleep(timeout)
+            return False
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if find_icon_coordinates_scaled(template_path=template_path) is not None:
+                return True
+            time.sleep(poll)
+        return False
+
     def open_mumu(self):
         """Open MuMu模拟器Pro"""
         if not self.mumu_path:
@@ -56,9 +81,14 @@ class GameAutomation:
             subprocess.run(["open", self.mumu_path], check=True)
             print("✅ MuMu模拟器Pro launched successfully")
             
-            # Wait for the emulator to start
+            # Wait for the emulator interface - poll for the play button
+            # template when one is configured instead of sleeping blindly
             print("⏳ Waiting for emulator interface to load...")
-            time.sleep(TIMING['MUMU_STARTUP_WAIT'])
+            ready_template = PLAY_BUTTONS.get(1)
+            if isinstance(ready_template, str):
+                self.wait_for_icon(ready_template, TIMING['MUMU_STARTUP_WAIT'])
+            else:
+                time.sleep(TIMING['MUMU_STARTUP_WAIT'])
             return True
             
         except subprocess.CalledProcessError as e:
@@ -92,7 +122,19 @@ class GameAutomation:
             print("Available emulator: 1")
             return False
         
-        target_x, target_y = coordinates
+        if isinstance(coordinates, str):
+            # Template-path coordinate (the default config mode) - locate
+            # the button on screen before clicking
+            if not ICON_DETECTION_AVAILABLE:
+                print("❌ Cannot locate template - icon detection not available")
+                return False
+            located = find_icon_coordinates_scaled(template_path=coordinates)
+            if located is None:
+                print(f"❌ Play button template not found on screen: {coordinates}")
+                return False
+            target_x, target_y = located
+        else:
+            target_x, target_y = coordinates
         
         try:
             print(f"🖱️  Clicking play button #{emulator_index} at ({target_x}, {target_y})")
@@ -100,7 +142,11 @@ class GameAutomation:
             
             print("✅ Play button clicked successfully!")
             print("⏳ Waiting for emulator to start...")
-            time.sleep(TIMING['EMULATOR_BOOT_WAIT'])
+            boot_template = COORDINATES.get('start_game')
+            if isinstance(boot_template, str):
+                self.wait_for_icon(boot_template, TIMING['EMULATOR_BOOT_WAIT'])
+            else:
+                time.sleep(TIMING['EMULATOR_BOOT_WAIT'])
             
             return True
             
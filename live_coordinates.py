@@ -5,15 +5,33 @@ Shows real-time mouse coordinates as you move your mouse
 """
 
 import pyautogui
+import threading
 import time
 import sys
 import os
 
+# Optional event-driven tracking - pynput delivers callbacks on actual
+# mouse motion, so the tracker burns no CPU while the mouse is still
+try:
+    from pynput import mouse
+    PYNPUT_AVAILABLE = True
+except ImportError:
+    PYNPUT_AVAILABLE = False
+
 def clear_line():
     """Clear the current line in terminal"""
     print('\r' + ' ' * 80, end='')
     print('\r', end='')
 
+# Fixed-width redraw template, formatted with str.format instead of a
+# per-update f-string; the constant width means no stale characters are
+# left behind, so redraws skip the clear_line() double write
+POSITION_FMT = "\r🎯 Mouse Position: ({:4d}, {:4d})"
+
+# Minimum seconds between terminal writes while the mouse is moving -
+# bounds flush syscalls at ~12Hz no matter how fast events arrive
+MIN_REDRAW_INTERVAL = 0.08
+
 def live_coordinates():
     """
     Display live mouse coordinates with enhanced visibility
@@ -24,21 +42,42 @@ def live_coordinates():
     print("Press Ctrl+C to stop")
     print("-" * 50)
     print()
-    
+
     try:
         last_x, last_y = -1, -1
-        
-        while True:
-            x, y = pyautogui.position()
-            
-            # Only update if position changed (reduces flicker)
-            if x != last_x or y != last_y:
-                clear_line()
-                print(f"🎯 Mouse Position: ({x:4d}, {y:4d})", end='', flush=True)
-                last_x, last_y = x, y
-            
-            time.sleep(0.05)  # Update every 50ms for smooth tracking
-            
+        last_draw = 0.0
+
+        def redraw(x, y):
+            nonlocal last_x, last_y, last_draw
+            now = time.monotonic()
+            # Redraw only on change, and at most ~12Hz while moving
+            if (x, y) == (last_x, last_y) or now - last_draw < MIN_REDRAW_INTERVAL:
+                return
+            sys.stdout.write(POSITION_FMT.format(x, y))
+            sys.stdout.flush()
+            last_x, last_y = x, y
+            last_draw = now
+
+        if PYNPUT_AVAILABLE:
+            # Event-driven: the OS wakes us only when the mouse actually
+            # moves, instead of polling Quartz every 50ms
+            position = [(-1, -1)]
+            moved = threading.Event()
+
+            def on_move(x, y):
+                position[0] = (int(x), int(y))
+                moved.set()
+
+            with mouse.Listener(on_move=on_move):
+                while True:
+                    moved.wait()
+                    moved.clear()
+                    redraw(*position[0])
+        else:
+            while True:
+                redraw(*pyautogui.position())
+                time.sleep(0.05)  # Update every 50ms for smooth tracking
+
     except KeyboardInterrupt:
         clear_line()
         print("\n\n✅ Coordinate tracking stopped")
@@ -57,20 +96,30 @@ def capture_on_click():
     print("Press Ctrl+C to stop")
     print("-" * 50)
     print()
-    
+
     captured = []
-    
+
     try:
-        while True:
-            x, y = pyautogui.position()
-            print(f"\r🎯 Current: ({x:4d}, {y:4d}) - Click to capture!", end='', flush=True)
-            
-            # Check for mouse click (this is a simplified approach)
-            time.sleep(0.1)
-            
-            # Note: This is a basic implementation
-            # For click detection, we'd need more advanced techniques
-            
+        if PYNPUT_AVAILABLE:
+            # Real click detection: the listener fires on actual button
+            # presses, so the main thread just sleeps until interrupted
+            def on_click(x, y, button, pressed):
+                if pressed:
+                    captured.append((int(x), int(y)))
+                    print(f"\n📌 Captured: ({int(x)}, {int(y)})")
+
+            with mouse.Listener(on_click=on_click):
+                while True:
+                    time.sleep(1)
+        else:
+            while True:
+                x, y = pyautogui.position()
+                print(f"\r🎯 Current: ({x:4d}, {y:4d}) - Click to capture!", end='', flush=True)
+
+                # Without pynput there is no click detection - this mode
+                # only mirrors the current position
+                time.sleep(0.1)
+
     except KeyboardInterrupt:
         clear_line()
         print("\n\n✅ Capture mode stopped")
@@ -95,4 +144,4 @@ def main():
         live_coordinates()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
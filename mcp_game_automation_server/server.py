@@ -6,12 +6,17 @@ This server exposes the existing game automation as an MCP tool that can be
 controlled by AI assistants like Claude Desktop.
 """
 
+import asyncio
+import os
+import select
 import subprocess
+from collections import deque
+import threading
 import time
-import os
 import sys
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 
 from mcp.server.fastmcp import FastMCP
 
@@ -20,11 +25,170 @@ mcp = FastMCP("Shimen Task Automation")
 
 # Get the project root directory (parent of mcp_game_automation_server)
 PROJECT_ROOT = Path(__file__).parent.parent.absolute()
-SCRIPT_PATH = PROJECT_ROOT / "run_shimen_task.sh"
+WORKER_PATH = PROJECT_ROOT / "shimen_worker.py"
+
+# Must match shimen_worker.DONE_SENTINEL
+DONE_SENTINEL = "__SHIMEN_DONE__"
+
+# How long a worker may take to import the stack and prewarm
+WORKER_READY_TIMEOUT = 120
+
+# 5 minute ceiling for one automation run, matching the old subprocess timeout
+RUN_TIMEOUT = 300
+
+
+@dataclass
+class PooledWorker:
+    """One warm shimen_worker.py process and its bookkeeping"""
+    process: subprocess.Popen
+    created_at: float
+    last_used: float
+    use_count: int = 0
+
+
+class ShimenWorkerPool:
+    """
+    Pool of warm worker processes for the automation tool.
+
+    Each worker has already paid interpreter startup, cv2/pyautogui
+    imports and template prewarming, so dispatching a run costs
+    milliseconds instead of seconds. Workers are recycled after
+    max_process_uses runs and reaped after max_idle_time seconds idle.
+    """
+
+    def __init__(self, max_pool_size: int = 2, max_idle_time: float = 300,
+                 max_process_uses: int = 100):
+        self.max_pool_size = max_pool_size
+        self.max_idle_time = max_idle_time
+        self.max_process_uses = max_process_uses
+        self._idle: List[PooledWorker] = []
+        self._lock = threading.Lock()
+        self._reaper_started = False
+
+    def acquire(self) -> PooledWorker:
+        """Hand out a warm worker, spawning one only when none is idle"""
+        with self._lock:
+            self._reap_locked()
+            if self._idle:
+                return self._idle.pop()
+        return self._spawn()
+
+    def release(self, worker: PooledWorker):
+        """Return a worker after a successful run"""
+        worker.use_count += 1
+        worker.last_used = time.time()
+        recycle = (worker.use_count >= self.max_process_uses
+                   or worker.process.poll() is not None)
+        if not recycle:
+            with self._lock:
+                if len(self._idle) < self.max_pool_size:
+                    self._idle.append(worker)
+                    return
+        self.discard(worker)
+
+    def discard(self, worker: PooledWorker):
+        """Shut a worker down, politely first"""
+        try:
+            if worker.process.poll() is None:
+                worker.process.stdin.write("quit\n")
+                worker.process.stdin.flush()
+                worker.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            worker.process.kill()
+
+    def _spawn(self) -> PooledWorker:
+        process = subprocess.Popen(
+            [sys.executable, str(WORKER_PATH)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            cwd=PROJECT_ROOT
+        )
+        # Block until the worker reports ready - this is the one place
+        # startup cost is still paid, once per worker lifetime
+        _read_until_done(process, time.time() + WORKER_READY_TIMEOUT)
+        now = time.time()
+        self._start_reaper()
+        return PooledWorker(process=process, created_at=now, last_used=now)
+
+    def _reap_locked(self):
+        """Drop idle workers that died or sat unused too long (lock held)"""
+        now = time.time()
+        keep = []
+        for worker in self._idle:
+            if (worker.process.poll() is not None
+                    or now - worker.last_used > self.max_idle_time):
+                self.discard(worker)
+            else:
+                keep.append(worker)
+        self._idle = keep
+
+    def _start_reaper(self):
+        # The tool handler is synchronous, so idle cleanup runs on a
+        # daemon thread rather than an asyncio task
+        if self._reaper_started:
+            return
+        self._reaper_started = True
+
+        def loop():
+            while True:
+                time.sleep(60)
+                with self._lock:
+                    self._reap_locked()
+
+        threading.Thread(target=loop, daemon=True).start()
+
+
+def _read_until_done(process: subprocess.Popen, deadline: float,
+                     max_lines: int = 500) -> Tuple[str, "deque"]:
+    """
+    Read worker stdout lines until the DONE sentinel.
+
+    Reads the raw file descriptor with os.read and splits lines itself.
+    Mixing select() with readline() on the buffered pipe object would
+    deadlock on burst writes: the first readline() drains the whole OS
+    pipe into Python's userspace buffer, and the next select() then
+    blocks on an empty fd even though the sentinel is already buffered.
+    The worker flushes in bursts (batched log records plus the sentinel
+    in one write), so that failure mode is the common case, not a
+    corner. Nothing else may read process.stdout while workers live.
+
+    Lines stream into a bounded deque, so memory stays constant no
+    matter how chatty a five-minute run gets - older lines simply roll
+    off once max_lines is reached. Returns (status, lines) where status
+    is the sentinel's payload. Raises TimeoutError past the deadline
+    and RuntimeError if the worker exits without reporting.
+    """
+    lines: deque = deque(maxlen=max_lines)
+    fd = process.stdout.fileno()
+    buffer = b""
+    while True:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise TimeoutError("worker did not finish in time")
+        ready, _, _ = select.select([fd], [], [], remaining)
+        if not ready:
+            raise TimeoutError("worker did not finish in time")
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            raise RuntimeError("worker exited unexpectedly")
+        buffer += chunk
+        # Consume every complete line in the burst before selecting again
+        while b"\n" in buffer:
+            raw_line, buffer = buffer.split(b"\n", 1)
+            line = raw_line.decode("utf-8", errors="replace")
+            if line.startswith(DONE_SENTINEL):
+                return line[len(DONE_SENTINEL):].strip(), lines
+            lines.append(line)
+
+
+_POOL = ShimenWorkerPool()
 
 
 @mcp.tool()
-def run_shimen_task(verbose: bool = False) -> Dict[str, Any]:
+async def run_shimen_task(verbose: bool = False) -> Dict[str, Any]:
     """
     Execute the 师门任务 (Shimen Task) automation sequence.
     
@@ -44,75 +208,69 @@ def run_shimen_task(verbose: bool = False) -> Dict[str, Any]:
         - execution_time_seconds: Time taken to execute
         - error_message: Error details if execution failed
     """
-    start_time = time.time()
+    # The pool dispatch blocks on pipe reads for up to five minutes, so
+    # it runs on a worker thread - the event loop stays free for other
+    # tools and protocol heartbeats while the automation runs
+    return await asyncio.to_thread(_run_shimen_sync, verbose)
+
+
+def _run_shimen_sync(verbose: bool) -> Dict[str, Any]:
+    """Blocking worker-pool dispatch behind the async tool handler"""
+    start_time = time.monotonic()
     
     try:
-        # Check if the script exists
-        if not SCRIPT_PATH.exists():
-            return {
-                "success": False,
-                "output": "",
-                "execution_time_seconds": 0,
-                "error_message": f"Script not found: {SCRIPT_PATH}"
-            }
+        # WORKER_PATH existence is verified once at server startup in
+        # main(), so no per-call stat is needed here
+        # Dispatch to a warm worker - imports and prewarming were paid
+        # when the worker started, not on this call
+        worker = _POOL.acquire()
         
-        # Make sure script is executable
-        os.chmod(SCRIPT_PATH, 0o755)
+        try:
+            worker.process.stdin.write("run\n")
+            worker.process.stdin.flush()
+            # Non-verbose callers only ever see ~500 chars, so don't
+            # retain more than the tail of the log for them
+            status, lines = _read_until_done(
+                worker.process, time.time() + RUN_TIMEOUT,
+                max_lines=100000 if verbose else 500)
+        except (TimeoutError, RuntimeError, OSError):
+            # The worker is in an unknown state - kill it rather than
+            # returning it to the pool
+            worker.process.kill()
+            raise
+        else:
+            _POOL.release(worker)
         
-        # Change to project directory before running script
-        original_cwd = os.getcwd()
-        os.chdir(PROJECT_ROOT)
+        execution_time = time.monotonic() - start_time
         
-        try:
-            # Run the automation script
-            result = subprocess.run(
-                [str(SCRIPT_PATH)],
-                capture_output=True,
-                text=True,
-                timeout=300,  # 5 minute timeout
-                cwd=PROJECT_ROOT
-            )
-            
-            execution_time = time.time() - start_time
-            
-            # Determine success based on exit code
-            success = result.returncode == 0
-            
-            # Combine stdout and stderr for complete output
-            output = ""
-            if result.stdout:
-                output += f"STDOUT:\n{result.stdout}\n"
-            if result.stderr:
-                output += f"STDERR:\n{result.stderr}\n"
-            
-            if not output.strip():
-                output = "No output captured from script"
-            
-            # Create response
-            response = {
-                "success": success,
-                "output": output if verbose else (output[:500] + "..." if len(output) > 500 else output),
-                "execution_time_seconds": round(execution_time, 2),
-                "error_message": None if success else f"Script exited with code {result.returncode}"
-            }
-            
-            return response
-            
-        finally:
-            # Restore original working directory
-            os.chdir(original_cwd)
+        # Determine success based on the worker's reported status
+        success = status == "0"
+        
+        output = "\n".join(lines)
+        if not output.strip():
+            output = "No output captured from automation"
+        
+        # Create response
+        response = {
+            "success": success,
+            "output": output if verbose else (output[:500] + "..." if len(output) > 500 else output),
+            "execution_time_seconds": round(execution_time, 2),
+            "error_message": None if success else f"Automation reported status {status}"
+        }
+        
+        return response
     
-    except subprocess.TimeoutExpired:
-        execution_time = time.time() - start_time
+    except TimeoutError:
+        execution_time = time.monotonic() - start_time
         return {
             "success": False,
-            "output": "Script execution timed out after 5 minutes",
+            "output": "Automation timed out after 5 minutes",
             "execution_time_seconds": round(execution_time, 2),
-            "error_message": "Timeout: Script took longer than 5 minutes to complete"
+            "error_message": "Timeout: Automation took longer than 5 minutes to complete"
         }
     
     except Exception as e:
-        execution_time = time.time() - start_time
+        execution_time = time.monotonic() - start_time
         return {
             "success": False,
             "output": "",
@@ -129,14 +287,14 @@ def main():
             print(f"Error: Project root not found at {PROJECT_ROOT}")
             sys.exit(1)
         
-        if not SCRIPT_PATH.exists():
-            print(f"Error: Automation script not found at {SCRIPT_PATH}")
+        if not WORKER_PATH.exists():
+            print(f"Error: Automation worker not found at {WORKER_PATH}")
             print("Make sure you're running this from the correct directory")
             sys.exit(1)
         
         print(f"Starting MCP server for 师门任务 automation...")
         print(f"Project root: {PROJECT_ROOT}")
-        print(f"Script path: {SCRIPT_PATH}")
+        print(f"Worker path: {WORKER_PATH}")
         print("Server ready to accept MCP connections via stdio transport")
         
         # Run the FastMCP server
@@ -18,18 +18,12 @@ export PATH="/usr/local/bin:/usr/bin:/bin:$PATH"
 # Log the start time
 echo "$(date): Starting 师门任务 automation (direct coordinates)..." >> shimen_task.log
 
-# Create a temporary config file using direct coordinates
-cp config_no_templates.py config.py.backup
-cp config_no_templates.py config.py
+# Select the direct-coordinate table in config.py (no file swapping needed)
+export GAME_AUTOMATION_MODE=direct
 
 # Run the automation script with direct coordinates
 ./venv/bin/python3 action_automation.py 师门任务 >> shimen_task.log 2>&1
 
-# Restore original config
-if [ -f "config.py.backup" ]; then
-    mv config.py.backup config.py
-fi
-
 # Check if the script ran successfully
 if [ $? -eq 0 ]; then
     echo "$(date): 师门任务 automation completed successfully" >> shimen_task.log
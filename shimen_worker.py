@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Warm Worker Process for MCP Automation Dispatch
+
+Long-running counterpart to run_shimen_task.sh: imports the automation
+stack once, prewarms caches, then executes one action plan per command
+read from stdin. The MCP server keeps a pool of these alive so a tool
+call costs only the plan itself, not interpreter startup plus cv2 and
+pyautogui imports on every invocation.
+
+Protocol (line-based, over stdio):
+    stdin:  one plan name per line ("run" is an alias for 师门任务,
+            "quit" exits)
+    stdout: the automation's normal output, streamed line by line,
+            terminated by "__SHIMEN_DONE__ <status>" where status is
+            0 on success, 1 on plan failure, 2 on an unexpected error
+"""
+
+import sys
+
+# Sentinel line marking the end of one command's output. Kept unlikely
+# to collide with the automation's own emoji-prefixed log lines.
+DONE_SENTINEL = "__SHIMEN_DONE__"
+
+DEFAULT_PLAN = "师门任务"
+
+
+def main():
+    # Heavy imports are paid exactly once, when the worker starts
+    from action_automation import ActionAutomation, flush_log
+
+    automation = ActionAutomation()
+    try:
+        automation.prewarm()
+    except Exception as e:
+        print(f"⚠️  Prewarm failed (continuing cold): {e}")
+
+    # Signal readiness so the server can tell startup from first use.
+    # Flush any buffered log records first: the sentinel goes straight
+    # to stdout, so records still sitting in the MemoryHandler would
+    # otherwise surface after it, inside the next command's capture.
+    flush_log()
+    print(f"{DONE_SENTINEL} ready", flush=True)
+
+    for line in sys.stdin:
+        command = line.strip()
+        if not command or command == "quit":
+            break
+
+        plan_name = DEFAULT_PLAN if command == "run" else command
+        try:
+            status = 0 if automation.execute_action_plan(plan_name) else 1
+        except Exception as e:
+            print(f"❌ Worker error running {plan_name}: {e}")
+            status = 2
+        flush_log()  # buffered records must land before the sentinel
+        print(f"{DONE_SENTINEL} {status}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
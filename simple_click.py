@@ -11,9 +11,12 @@ import sys
 # Import shared configuration
 from config import PLAY_BUTTONS, PYAUTOGUI_SETTINGS, TIMING, MARKER_SETTINGS
 
-def click_play_button(emulator_number=1, show_marker=True):
+def click_play_button(emulator_number=1, show_marker=True, wait_for_boot=True):
     """
     Click play button for specific emulator using known coordinates
+    
+    wait_for_boot lets automated callers skip the emulator boot sleep
+    when they poll readiness themselves.
     """
     if emulator_number not in PLAY_BUTTONS:
         print(f"❌ Invalid emulator number: {emulator_number}")
@@ -24,40 +27,42 @@ def click_play_button(emulator_number=1, show_marker=True):
     
     print(f"🎯 Clicking emulator #{emulator_number} play button at ({x}, {y})")
     
+    # The global PAUSE adds half a second after every pyautogui call;
+    # the moveTo duration and countdown already pace this function, so
+    # drop the pause locally and restore it on the way out
+    saved_pause = pyautogui.PAUSE
+    pyautogui.PAUSE = 0
     try:
         if show_marker:
-            # Show visual marker by moving mouse to position first
+            # One smooth move to the target marks the spot; the old
+            # 12-segment square sweep spent ~4s (plus a PAUSE per call)
+            # saying the same thing
             print("🎯 Moving mouse to target position...")
             pyautogui.moveTo(x, y, duration=MARKER_SETTINGS['MOVEMENT_DURATION'])
-            time.sleep(0.5)  # Brief pause to see the position
-            
-            # Move mouse in a small circle to make it more visible
-            print("📍 Marking position with visual indicator...")
-            marker_size = MARKER_SETTINGS['MARKER_SIZE']
-            for i in range(3):
-                pyautogui.moveRel(marker_size, 0, duration=0.1)
-                pyautogui.moveRel(0, marker_size, duration=0.1)
-                pyautogui.moveRel(-marker_size, 0, duration=0.1)
-                pyautogui.moveRel(0, -marker_size, duration=0.1)
-            
-            # Return to center and countdown
-            pyautogui.moveTo(x, y, duration=0.2)
-            print("⏰ Clicking in:")
-            for i in range(MARKER_SETTINGS['COUNTDOWN_STEPS'], 0, -1):
-                print(f"   {i}...")
-                time.sleep(0.5)
+            countdown = MARKER_SETTINGS['COUNTDOWN_STEPS']
+            if sys.stdout.isatty():
+                print("⏰ Clicking in:")
+                for i in range(countdown, 0, -1):
+                    print(f"   {i}...")
+                    time.sleep(0.5)
+            else:
+                # Nobody watches a per-step countdown in a log file
+                time.sleep(countdown * 0.5)
         
         # Click the button
         print("🖱️  Clicking now...")
         pyautogui.click(x, y)
         print("✅ Click successful!")
-        print("⏳ Waiting for emulator to start...")
-        time.sleep(TIMING['EMULATOR_BOOT_WAIT'])
+        if wait_for_boot:
+            print("⏳ Waiting for emulator to start...")
+            time.sleep(TIMING['EMULATOR_BOOT_WAIT'])
         return True
         
     except Exception as e:
         print(f"❌ Click failed: {e}")
         return False
+    finally:
+        pyautogui.PAUSE = saved_pause
 
 def main():
     print("🎮 Simple Play Button Clicker")